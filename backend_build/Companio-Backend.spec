@@ -51,11 +51,17 @@ a = Analysis(
         'fastembed',
         'pydantic',
         'appdirs',
+        'tiktoken',
+        'tiktoken_ext',
+        'tiktoken_ext.openai_public',  # Registers the encodings; found only through a namespace-package scan
         'inflect',  # Added inflect
         'typeguard',  # Added typeguard
         'typeguard._decorators',  # Added typeguard internals
         'gruut',  # Added gruut
         'jamo',
+        # Speech engines imported lazily by speech_pipeline
+        'offline_text_to_speech',
+        'azure_text_to_speech',
     ],
     hookspath=['/Users/bukuo/Documents/Coding/Python/Group25/backend_build/hooks'],  # Include the hooks directory
     hooksconfig={},
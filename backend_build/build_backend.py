@@ -27,6 +27,9 @@ else:  # Linux
 
 QDRANT_PATH = os.path.join(BIN_DIR, QDRANT_BINARY)
 
+# tiktoken encodings bundled for offline token counting (AZURE_TOKENIZER in templates/config.py)
+TIKTOKEN_ENCODINGS = ["o200k_base"]
+
 def prepare_tts_model():
     """Download and prepare the TTS model if needed"""
     try:
@@ -56,6 +59,28 @@ def prepare_tts_model():
         print(f"Error preparing TTS model: {e}")
         return None
 
+def prepare_tiktoken_encodings():
+    """Download the tiktoken encoding files into a cache directory to bundle"""
+    try:
+        cache_dir = os.path.join(os.path.abspath(os.path.dirname(__file__)), "tiktoken_cache")
+        os.makedirs(cache_dir, exist_ok=True)
+        os.environ["TIKTOKEN_CACHE_DIR"] = cache_dir
+        
+        import tiktoken
+        
+        for encoding_name in TIKTOKEN_ENCODINGS:
+            # Downloads the file on first use and checks it against the hash pinned by tiktoken
+            tiktoken.get_encoding(encoding_name)
+            print(f"tiktoken encoding {encoding_name} is ready.")
+        return cache_dir
+        
+    except ImportError:
+        print("Warning: tiktoken is not installed. Azure token counting will fall back to estimates.")
+        return None
+    except Exception as e:
+        print(f"Error preparing tiktoken encodings: {e}")
+        return None
+
 def check_dependencies():
     """Check if all dependencies are installed"""
     requirements_file = os.path.join(TEMPLATES_DIR, "templates_requirements.txt")
@@ -197,6 +222,11 @@ def setup_runtime_environment():
         templates_dir = os.path.join(app_dir, "templates")
         if templates_dir not in sys.path:
             sys.path.append(templates_dir)
+        
+        # Use the bundled tiktoken encodings instead of downloading them
+        tiktoken_cache_dir = os.path.join(sys._MEIPASS, "tiktoken_cache")
+        if os.path.exists(tiktoken_cache_dir):
+            os.environ.setdefault('TIKTOKEN_CACHE_DIR', tiktoken_cache_dir)
 
 # Run the setup
 setup_runtime_environment()
@@ -256,7 +286,7 @@ def copy_version_files():
     
     return version_files, temp_dir
 
-def create_spec_file(tts_model_path, hook_file, hooks_dir, version_files, tts_patch_file, torch_libs=None, source_patch_file=None, qdrant_patch_file=None, espeak_dir=None):
+def create_spec_file(tts_model_path, hook_file, hooks_dir, version_files, tts_patch_file, torch_libs=None, source_patch_file=None, qdrant_patch_file=None, espeak_dir=None, tiktoken_cache_dir=None):
     """Create a PyInstaller spec file for the application"""
     
     # Get application directory (to set paths correctly)
@@ -286,6 +316,10 @@ def create_spec_file(tts_model_path, hook_file, hooks_dir, version_files, tts_pa
     if espeak_dir:
         datas.append((espeak_dir, 'espeak'))
     
+    # Add the tiktoken encodings if prepared
+    if tiktoken_cache_dir:
+        datas.append((tiktoken_cache_dir, 'tiktoken_cache'))
+    
     # Format the datas array for the spec file
     datas_str = ", ".join([f"('{item[0]}', '{item[1]}')" for item in datas])
     
@@ -369,11 +403,17 @@ a = Analysis(
         'fastembed',
         'pydantic',
         'appdirs',
+        'tiktoken',
+        'tiktoken_ext',
+        'tiktoken_ext.openai_public',  # Registers the encodings; found only through a namespace-package scan
         'inflect',  # Added inflect
         'typeguard',  # Added typeguard
         'typeguard._decorators',  # Added typeguard internals
         'gruut',  # Added gruut
         'jamo',
+        # Speech engines imported lazily by speech_pipeline
+        'offline_text_to_speech',
+        'azure_text_to_speech',
     ],
     hookspath=['{hooks_dir}'],  # Include the hooks directory
     hooksconfig={{}},
@@ -1328,6 +1368,9 @@ def main():
     # Prepare TTS model
     tts_model_path = prepare_tts_model()
     
+    # Prepare tiktoken encodings
+    tiktoken_cache_dir = prepare_tiktoken_encodings()
+    
     # Prepare VERSION files
     version_files, temp_dir = copy_version_files()
     
@@ -1390,7 +1433,7 @@ def main():
     # Create spec file (now including espeak)
     spec_file = create_spec_file(tts_model_path, hook_file, hooks_dir, version_files, 
                                tts_patch_file, torch_libs, source_patch_file, 
-                               None, espeak_dir)
+                               None, espeak_dir, tiktoken_cache_dir)
     
     # Build the application
     success, distpath = build_application(spec_file)
@@ -42,6 +42,11 @@ def setup_runtime_environment():
         templates_dir = os.path.join(app_dir, "templates")
         if templates_dir not in sys.path:
             sys.path.append(templates_dir)
+        
+        # Use the bundled tiktoken encodings instead of downloading them
+        tiktoken_cache_dir = os.path.join(sys._MEIPASS, "tiktoken_cache")
+        if os.path.exists(tiktoken_cache_dir):
+            os.environ.setdefault('TIKTOKEN_CACHE_DIR', tiktoken_cache_dir)
 
 # Run the setup
 setup_runtime_environment()
@@ -60,8 +60,8 @@ function resolveEnvPath(envPath) {
   return allPaths.join(':');
 }
 
-// Function to check if backend API is responding
-async function checkBackendAPI(port = 8000, retries = 600, delay = 500) {
+// Function to check if backend API is responding and its models are warmed up
+async function checkBackendAPI(port = 8000, retries = 600, delay = 500, path = '/ready') {
   log(`Checking if backend API is up on port ${port}...`);
   
   return new Promise((resolve) => {
@@ -84,7 +84,7 @@ async function checkBackendAPI(port = 8000, retries = 600, delay = 500) {
       const req = http.request({
         hostname: 'localhost',
         port: port,
-        path: '/health', 
+        path: path, 
         method: 'GET',
         timeout: 1000 
       }, (res) => {
@@ -445,8 +445,8 @@ async function runBackend() {
   if (!portAvailable) {
     log('Port 8000 is already in use. Checking if it\'s our backend...');
     
-    // Check if the backend API is responding on this port
-    const isApiUp = await checkBackendAPI(8000, 240, 500);
+    // Only asks whether our backend is alive; it may still be warming up its models
+    const isApiUp = await checkBackendAPI(8000, 240, 500, '/health');
     if (isApiUp) {
       log('Backend API is already running and responding correctly');
       return true;
@@ -720,7 +720,7 @@ ipcMain.on('close-window', () => {
 ipcMain.handle('get-backend-status', async () => {
   if (backendProcess && backendProcess.pid) {
     // Check if backend is still responding
-    const isResponding = await checkBackendAPI(8000, 2, 500);
+    const isResponding = await checkBackendAPI(8000, 2, 500, '/health');
     return {
       running: true,
       responding: isResponding,
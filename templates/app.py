@@ -66,7 +66,7 @@ def main():
     
     # Check if Qdrant port (6333) is already in use
     if is_port_in_use(6333):
-        logger.info("Qdrant port 6333 is already in use. Will connect to existing Qdrant server.")
+        logger.info("Qdrant port 6333 is already in use. Will connect to existing Qdrant server (over REST if it has no gRPC port).")
     
     # Acquire process lock to prevent multiple instances
     lock = acquire_lock()
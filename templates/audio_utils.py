@@ -0,0 +1,78 @@
+import io
+import struct
+import wave
+
+import numpy as np
+
+# Placeholder RIFF/data size for WAV streams whose final length is unknown
+STREAMING_WAV_SIZE = 0xFFFFFFFF
+
+
+def pcm16_from_float(samples) -> bytes:
+    """Convert float samples in [-1, 1] to little-endian 16-bit PCM bytes."""
+    samples = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+    return (samples * 32767).astype("<i2").tobytes()
+
+
+def wav_header(sample_rate: int, channels: int = 1, bits_per_sample: int = 16, data_size: int | None = None) -> bytes:
+    """
+    Build a 44-byte PCM WAV header.
+
+    Pass data_size=None for a streaming header: the RIFF and data chunk sizes
+    are set to the maximum value, which players treat as "read until EOF".
+    """
+    byte_rate = sample_rate * channels * bits_per_sample // 8
+    block_align = channels * bits_per_sample // 8
+    if data_size is None:
+        riff_size = data_size = STREAMING_WAV_SIZE
+    else:
+        riff_size = 36 + data_size
+    return (
+        b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def wav_to_pcm(wav_bytes: bytes) -> tuple:
+    """Extract (PCM frames, sample rate) from in-memory WAV bytes."""
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wav_file:
+        return wav_file.readframes(wav_file.getnframes()), wav_file.getframerate()
+
+
+def pcm16_to_float(pcm: bytes) -> np.ndarray:
+    """Convert 16-bit PCM bytes to float32 samples in [-1, 1]."""
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32767
+
+
+def encode_audio(pcm: bytes, sample_rate: int, audio_format: str = "wav") -> bytes:
+    """
+    Encode 16-bit mono PCM entirely in memory.
+
+    Supported formats: "wav", "pcm" (raw frames) and "opus" (Ogg/Opus at 48 kHz,
+    needs torchaudio with the FFmpeg backend).
+    """
+    if audio_format == "pcm":
+        return pcm
+    if audio_format == "wav":
+        return wav_header(sample_rate, data_size=len(pcm)) + pcm
+    if audio_format == "opus":
+        import torch
+        import torchaudio
+
+        # Opus only supports a few sample rates; 48 kHz is its native rate
+        waveform = torch.from_numpy(pcm16_to_float(pcm)).unsqueeze(0)
+        if sample_rate != 48000:
+            waveform = torchaudio.functional.resample(waveform, sample_rate, 48000)
+        buffer = io.BytesIO()
+        torchaudio.save(buffer, waveform, 48000, format="ogg", encoding="opus", backend="ffmpeg")
+        return buffer.getvalue()
+    raise ValueError(f"Unsupported audio format: {audio_format}")
+
+
+AUDIO_MEDIA_TYPES = {
+    "wav": "audio/wav",
+    # Not audio/L16: that type is big-endian, pcm16_from_float writes little-endian
+    "pcm": "audio/pcm; encoding=s16le; channels=1",
+    "opus": "audio/ogg; codecs=opus",
+}
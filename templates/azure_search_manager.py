@@ -5,42 +5,59 @@ from datetime import datetime
 import numpy as np
 import uuid  # For generating unique memory IDs
 from collections import defaultdict
+from embedding_cache import embedding_cache
+from memory_relevance import select_memories
 
-async def store_memory(kernel: Kernel, user_id, memory_text, category):
-    """Stores a memory in Azure AI Search, ensuring uniqueness."""
+async def store_memories(kernel: Kernel, memories):
+    """Stores several (user_id, memory_text, category) memories in Azure AI Search in one batch.
+    An ISO timestamp may be given as a fourth element (defaults to now)."""
     
     if "collection" not in kernel.services:
         print("Azure AI Search is not available in Ollama mode.")
         return
 
+    if not memories:
+        return
+
     vectorizer = kernel.services["vectorizer"]
     collection = kernel.services["collection"]
 
-    # Create a unique ID using timestamp + user_id + uuid
-    memory_id = f"{user_id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    records = []
+    for memory in memories:
+        user_id, memory_text, category = memory[:3]
+        # Create a unique ID using timestamp + user_id + uuid
+        memory_id = f"{user_id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
 
-    record = ElderlyUserMemory(
-        id=memory_id,  # ✅ Unique ID per memory
-        memory_text=memory_text,
-        category=category,
-        timestamp=datetime.utcnow().isoformat() + "Z"
-    )
+        records.append(ElderlyUserMemory(
+            id=memory_id,  # ✅ Unique ID per memory
+            memory_text=memory_text,
+            category=category,
+            timestamp=memory[3] if len(memory) > 3 and memory[3] else datetime.utcnow().isoformat() + "Z"
+        ))
 
-    # Generate embedding
-    record = await vectorizer.add_vector_to_records(record, ElderlyUserMemory)
+    # Generate embeddings
+    records = await vectorizer.add_vector_to_records(records, ElderlyUserMemory)
 
     # Store in Azure AI Search
-    await collection.upsert(record)
+    await collection.upsert_batch(records)
 
-async def apply_rrf(text_results, vector_results, k=60, final_top_k=5):
-    """Helper function for RRF (Rank Reciprocal Fusion) algorithm."""
+async def apply_rrf(text_results, vector_results, k=60, final_top_k=5, with_scores=False, require_vector_match=False):
+    """Helper function for RRF (Rank Reciprocal Fusion) algorithm.
+
+    With with_scores=True, (memory_text, fusion_score) pairs are returned.
+    With require_vector_match=True, only documents the vector search returned
+    are kept: text search then only boosts their rank.
+    """
     fusion_scores = defaultdict(float)
     doc_map = {}
+    vector_doc_ids = set()
 
-    async def add_to_fusion(results, weight=1):
+    async def add_to_fusion(results, weight=1, doc_ids=None):
         rank = 0
         async for result in results.results:  # ✅ Fixed: Use async iteration
             doc_id = result.record.id
+            if doc_ids is not None:
+                doc_ids.add(doc_id)
             memory_text = result.record.memory_text  # Extract memory text
 
             # Store the document mapping
@@ -52,18 +69,27 @@ async def apply_rrf(text_results, vector_results, k=60, final_top_k=5):
             rank += 1
 
     await add_to_fusion(text_results, weight=1)
-    await add_to_fusion(vector_results, weight=1)
+    await add_to_fusion(vector_results, weight=1, doc_ids=vector_doc_ids)
 
     # **Step 4: Sort by RRF Score**
-    sorted_doc_ids = sorted(fusion_scores.keys(), key=lambda doc_id: fusion_scores[doc_id], reverse=True)
+    doc_ids = vector_doc_ids if require_vector_match else fusion_scores.keys()
+    sorted_doc_ids = sorted(doc_ids, key=lambda doc_id: fusion_scores[doc_id], reverse=True)
 
     # **Step 5: Retrieve memory_text values in ranked order**
+    if with_scores:
+        return [(doc_map[doc_id], fusion_scores[doc_id]) for doc_id in sorted_doc_ids[:final_top_k]]
     final_results = [doc_map[doc_id] for doc_id in sorted_doc_ids[:final_top_k]]
 
     return final_results
 
-async def search_memory(kernel: Kernel, query, top_k=10):
-    """Searches for a memory using both text search and vector search."""
+async def search_memory(kernel: Kernel, query, top_k=10, with_scores=False):
+    """Searches for a memory using both text search and vector search.
+
+    Fused results are filtered by relevance (see memory_relevance.select_memories)
+    and returned best first; with_scores=True returns (memory_text, score) pairs.
+    RRF scores only reflect rank, so when vector search is available a memory
+    must also clear its similarity threshold; text-only keyword hits are dropped.
+    """
 
     if "collection" not in kernel.services:
         print("Azure AI Search is not available in Ollama mode.")
@@ -78,7 +104,15 @@ async def search_memory(kernel: Kernel, query, top_k=10):
     vector_results = []
     if "vectorizer" in kernel.services:
         vectorizer = kernel.services["vectorizer"]
-        query_vector = (await vectorizer.kernel.get_service("embedding").generate_raw_embeddings([query]))[0]
+        embedding_service = vectorizer.kernel.get_service("embedding")
+
+        async def embed_query():
+            return (await embedding_service.generate_raw_embeddings([query]))[0]
+
+        # Repeated queries reuse the cached embedding instead of a paid API call
+        query_vector = await embedding_cache.get_or_compute(
+            f"azure:{embedding_service.ai_model_id}", query, embed_query
+        )
 
         vector_results = await collection.vectorized_search(
             vector=query_vector,
@@ -90,8 +124,14 @@ async def search_memory(kernel: Kernel, query, top_k=10):
         )
 
     # **Step 3: Merge Results (Avoid Duplicates)**
-    memory_results = set()
-    
-    memory_results = await apply_rrf(text_results, vector_results, k=60)
+    scored_results = await apply_rrf(
+        text_results, vector_results, k=60, final_top_k=top_k, with_scores=True,
+        require_vector_match="vectorizer" in kernel.services,
+    )
+
+    # **Step 4: Keep only the relevant ones (relevance was gated by the vector search threshold above)**
+    memory_results = select_memories(scored_results, relative_cutoff=None)
 
-    return list(memory_results)
\ No newline at end of file
+    if with_scores:
+        return memory_results
+    return [memory_text for memory_text, _ in memory_results]
\ No newline at end of file
@@ -0,0 +1,178 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+
+def create_azure_synthesizer(voice: str):
+    """
+    Build an in-memory SpeechSynthesizer for a voice and pre-open its connection.
+
+    Returns (synthesizer, connection). Any factory with the same shape can be
+    passed to SynthesizerPool, e.g. FakeFactory in the tests: the synthesizer
+    needs speak_text_async(text).get() returning a result with `reason` and
+    `audio_data`; the connection (or None) needs open(bool), close() and
+    `connected` / `disconnected` signals with connect(callback).
+    """
+    import azure.cognitiveservices.speech as speechsdk
+
+    speech_config = speechsdk.SpeechConfig(subscription=config.AZURE_SPEECH_KEY, region=config.AZURE_SPEECH_REGION)
+    speech_config.speech_synthesis_voice_name = voice
+    synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+
+    # Pre-connect so the first request doesn't pay for connection setup and TLS
+    connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+    connection.open(True)
+    return synthesizer, connection
+
+
+class PooledSynthesizer:
+    """A synthesizer plus its connection state, as handed out by SynthesizerPool."""
+
+    def __init__(self, voice: str, synthesizer, connection):
+        self.voice = voice
+        self.synthesizer = synthesizer
+        self.connection = connection
+        self.connected = True
+        self.healthy = True
+        self.last_used = time.monotonic()
+        if connection is not None:
+            connection.connected.connect(lambda evt: self._set_connected(True))
+            connection.disconnected.connect(lambda evt: self._set_connected(False))
+
+    def _set_connected(self, connected: bool):
+        self.connected = connected
+
+    def discard(self):
+        """Mark as unhealthy so it is closed instead of returned to the pool."""
+        self.healthy = False
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception as e:
+                print(f"Error closing speech synthesizer connection: {e}")
+
+
+class SynthesizerPool:
+    """
+    Per-voice pool of pre-connected speech synthesizers.
+
+    Synthesizers are reused across requests instead of building a new
+    SpeechConfig/SpeechSynthesizer (and connection) each time. Ones whose
+    connection dropped, that failed a synthesis, or that sat idle longer
+    than idle_timeout are closed rather than reused. Idle ones are also
+    closed by a timer, so a quiet pool doesn't keep connections open.
+    """
+
+    def __init__(
+        self,
+        factory=create_azure_synthesizer,
+        max_idle_per_voice: int = config.AZURE_TTS_POOL_SIZE,
+        idle_timeout: float = config.AZURE_TTS_POOL_IDLE_SECONDS,
+    ):
+        self._factory = factory
+        self.max_idle_per_voice = max_idle_per_voice
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._eviction_timer = None
+        self._stats = {"created": 0, "reused": 0, "evicted": 0, "discarded": 0}
+
+    def acquire(self, voice: str) -> PooledSynthesizer:
+        """Take an idle healthy synthesizer for the voice, or create one."""
+        self.evict_idle()
+        with self._lock:
+            idle = self._idle.get(voice, [])
+            while idle:
+                pooled = idle.pop()
+                if pooled.connected and pooled.healthy:
+                    self._stats["reused"] += 1
+                    return pooled
+                self._stats["discarded"] += 1
+                pooled.close()
+            self._stats["created"] += 1
+
+        synthesizer, connection = self._factory(voice)
+        return PooledSynthesizer(voice, synthesizer, connection)
+
+    def release(self, pooled: PooledSynthesizer):
+        """Return a synthesizer to the pool (or close it if unhealthy or the pool is full)."""
+        pooled.last_used = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(pooled.voice, [])
+            if pooled.healthy and pooled.connected and len(idle) < self.max_idle_per_voice:
+                idle.append(pooled)
+                self._schedule_eviction()
+                return
+            self._stats["discarded"] += 1
+        pooled.close()
+
+    def _schedule_eviction(self):
+        """Start the idle-eviction timer if it isn't running (called with the lock held)."""
+        if not self.idle_timeout or self._eviction_timer is not None:
+            return
+        self._eviction_timer = threading.Timer(self.idle_timeout, self._run_eviction)
+        self._eviction_timer.daemon = True
+        self._eviction_timer.start()
+
+    def _run_eviction(self):
+        with self._lock:
+            self._eviction_timer = None
+        self.evict_idle()
+        with self._lock:
+            # Check again later while connections are still parked
+            if any(self._idle.values()):
+                self._schedule_eviction()
+
+    @contextmanager
+    def synthesizer(self, voice: str):
+        """Lease a synthesizer; it is discarded if the block raises."""
+        pooled = self.acquire(voice)
+        try:
+            yield pooled
+        except Exception:
+            pooled.discard()
+            raise
+        finally:
+            self.release(pooled)
+
+    def prewarm(self, voices):
+        """Create and connect one synthesizer per voice ahead of the first request."""
+        for voice in voices:
+            self.release(self.acquire(voice))
+
+    def evict_idle(self):
+        """Close synthesizers that have been idle longer than idle_timeout."""
+        if not self.idle_timeout:
+            return
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for voice, idle in self._idle.items():
+                keep = [p for p in idle if now - p.last_used <= self.idle_timeout]
+                expired.extend(p for p in idle if now - p.last_used > self.idle_timeout)
+                self._idle[voice] = keep
+            self._stats["evicted"] += len(expired)
+        for pooled in expired:
+            pooled.close()
+
+    def close(self):
+        """Close every idle synthesizer (e.g. on shutdown)."""
+        with self._lock:
+            pooled_all = [p for idle in self._idle.values() for p in idle]
+            self._idle.clear()
+            if self._eviction_timer is not None:
+                self._eviction_timer.cancel()
+                self._eviction_timer = None
+        for pooled in pooled_all:
+            pooled.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "idle": {voice: len(idle) for voice, idle in self._idle.items()}}
+
+
+synthesizer_pool = SynthesizerPool()
@@ -1,34 +1,55 @@
 import azure.cognitiveservices.speech as speechsdk
-from config import AZURE_SPEECH_KEY, AZURE_SPEECH_REGION
+from config import AZURE_SPEECH_KEY, AZURE_SPEECH_REGION, AZURE_TTS_VOICES
+from audio_utils import pcm16_to_float, wav_to_pcm
+from azure_synthesizer_pool import synthesizer_pool
+
+# Voice selection based on gender
+voice_mapping = AZURE_TTS_VOICES
+
+def _synthesize(text, gender="male"):
+    """Synthesizes text with a pooled synthesizer and returns the WAV bytes (empty on failure)."""
+    # Default to male if gender is invalid
+    selected_voice = voice_mapping.get(gender, "en-US-GuyNeural")
+
+    with synthesizer_pool.synthesizer(selected_voice) as pooled:
+        result = pooled.synthesizer.speak_text_async(text).get()
+
+        # Check if synthesis completed successfully
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            if result.audio_data:
+                return bytes(result.audio_data)
+            print("Speech synthesis returned no audio data")
+            return bytes()
+
+        # Don't reuse a synthesizer whose request failed
+        pooled.discard()
+
+        # Handle cancelation errors specifically
+        if result.reason == speechsdk.ResultReason.Canceled:
+            cancellation_details = speechsdk.CancellationDetails.from_result(result)
+            print(f"Speech synthesis canceled: {cancellation_details.reason}")
+            print(f"Error details: {cancellation_details.error_details}")
+        else:
+            print(f"Speech synthesis failed: {result.reason}")
+        return bytes()
 
 def text_to_speech(text, gender="male"):
     """Converts text to speech using Azure Cognitive Services, selecting a voice based on gender."""
     if not text or not text.strip():
         print("Empty text provided to text_to_speech")
         return
-    
-    # Voice selection based on gender
-    voice_mapping = {
-        "male": "en-US-GuyNeural",
-        "female": "en-US-JennyNeural"
-    }
-
-    # Default to female if gender is invalid
-    selected_voice = voice_mapping.get(gender, "en-US-GuyNeural")
-
-    speech_config = speechsdk.SpeechConfig(subscription=AZURE_SPEECH_KEY, region=AZURE_SPEECH_REGION)
-    speech_config.speech_synthesis_voice_name = selected_voice
 
-    # For direct playback, explicitly use default speaker
-    audio_config = speechsdk.audio.AudioOutputConfig(use_default_speaker=True)
-    synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_config)
-    
-    result = synthesizer.speak_text_async(text).get()
+    audio_bytes = text_to_speech_to_bytes(text, gender=gender)
+    if not audio_bytes:
+        print("❌ Speech synthesis failed")
+        return
 
-    if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-        print("🔊 Speech output played successfully.")
-    else:
-        print(f"❌ Speech synthesis failed: {result.reason}")
+    # Play from memory on the default speaker
+    import sounddevice as sd
+    pcm, sample_rate = wav_to_pcm(audio_bytes)
+    sd.play(pcm16_to_float(pcm), sample_rate)
+    sd.wait()
+    print("🔊 Speech output played successfully.")
 
 
 def text_to_speech_to_bytes(text, gender="male"):
@@ -36,113 +57,35 @@ def text_to_speech_to_bytes(text, gender="male"):
     if not text or not text.strip():
         print("Empty text provided to text_to_speech_to_bytes")
         return bytes()
-        
+
     if not AZURE_SPEECH_KEY or not AZURE_SPEECH_REGION:
         print("Azure Speech credentials not configured")
         return bytes()
-    
-    # Voice selection based on gender
-    voice_mapping = {
-        "male": "en-US-GuyNeural",
-        "female": "en-US-JennyNeural"
-    }
-    
-    # Default to female if gender is invalid
-    selected_voice = voice_mapping.get(gender, "en-US-GuyNeural")
-    
+
     try:
-        # Create a temporary file for storing the output
-        import tempfile
-        import os
-        temp_file_path = ""
-        
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file_path = temp_file.name
-        
-            # Set up the speech config with safety checks
-            speech_config = speechsdk.SpeechConfig(
-                subscription=AZURE_SPEECH_KEY, 
-                region=AZURE_SPEECH_REGION
-            )
-            speech_config.speech_synthesis_voice_name = selected_voice
-            
-            # Configure audio output to file
-            audio_config = speechsdk.audio.AudioOutputConfig(filename=temp_file_path)
-            
-            # Create synthesizer
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=speech_config, 
-                audio_config=audio_config
-            )
-            
-            # Use a timeout to prevent hanging
-            result = synthesizer.speak_text_async(text).get()
-            
-            # Check if synthesis completed successfully
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                # Verify the file exists and has content
-                if os.path.exists(temp_file_path) and os.path.getsize(temp_file_path) > 0:
-                    # Read audio bytes from file
-                    with open(temp_file_path, 'rb') as audio_file:
-                        audio_bytes = audio_file.read()
-                    return audio_bytes
-                else:
-                    print(f"Output file is missing or empty: {temp_file_path}")
-                    return bytes()
-            else:
-                # Handle cancelation errors specifically
-                if result.reason == speechsdk.ResultReason.Canceled:
-                    cancellation_details = speechsdk.CancellationDetails.from_result(result)
-                    print(f"Speech synthesis canceled: {cancellation_details.reason}")
-                    print(f"Error details: {cancellation_details.error_details}")
-                else:
-                    print(f"Speech synthesis failed: {result.reason}")
-                return bytes()
-                
-        except Exception as synth_error:
-            print(f"TTS synthesis error: {str(synth_error)}")
-            return bytes()
-            
-    except Exception as outer_error:
-        print(f"Outer TTS error: {str(outer_error)}")
+        return _synthesize(text, gender=gender)
+    except Exception as synth_error:
+        print(f"TTS synthesis error: {str(synth_error)}")
         return bytes()
-        
-    finally:
-        # Clean up temp file in a safer way
-        try:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-        except Exception as cleanup_error:
-            print(f"Error cleaning up temp file: {str(cleanup_error)}")
+
+def text_to_speech_to_pcm(text, gender="male"):
+    """Converts text to speech and returns (16-bit mono PCM bytes, sample rate)."""
+    audio_bytes = text_to_speech_to_bytes(text, gender=gender)
+    if not audio_bytes:
+        return bytes(), 16000
+    return wav_to_pcm(audio_bytes)
 
 def text_to_speech_to_file(text, file_path="output.wav", gender="male"):
     """Converts text to speech and saves to a file, selecting a voice based on gender."""
     if not text or not text.strip():
         print("Empty text provided to text_to_speech_to_file")
         return False
-        
-    # Voice selection based on gender
-    voice_mapping = {
-        "male": "en-US-GuyNeural",
-        "female": "en-US-JennyNeural"
-    }
-    
-    # Default to female if gender is invalid
-    selected_voice = voice_mapping.get(gender, "en-US-GuyNeural")
 
-    speech_config = speechsdk.SpeechConfig(subscription=AZURE_SPEECH_KEY, region=AZURE_SPEECH_REGION)
-    speech_config.speech_synthesis_voice_name = selected_voice
-    
-    audio_config = speechsdk.audio.AudioOutputConfig(filename=file_path)
-    synthesizer = speechsdk.SpeechSynthesizer(
-        speech_config=speech_config, audio_config=audio_config)
-    
-    result = synthesizer.speak_text_async(text).get()
-    
-    if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-        return True
-    else:
-        print(f"❌ Speech synthesis failed: {result.reason}")
+    audio_bytes = text_to_speech_to_bytes(text, gender=gender)
+    if not audio_bytes:
+        print("❌ Speech synthesis failed")
         return False
 
+    with open(file_path, "wb") as audio_file:
+        audio_file.write(audio_bytes)
+    return True
@@ -0,0 +1,136 @@
+"""
+Recall / latency comparison of pooled vs. uncompressed ColBERT multivectors.
+
+Embeds a set of memories once with the ColBERT model, stores them in one
+temporary Qdrant collection per pool factor (factor 1 = uncompressed
+baseline), runs the same MaxSim queries against each, and reports
+recall@k relative to the baseline ranking, stored vectors, storage size,
+pooling time and query latency.
+
+Usage:
+    python benchmark_colbert_pooling.py --memories notes.jsonl [--queries queries.txt]
+        [--pool-factors 1,2,3,4] [--top-k 5] [--url http://localhost:6333 | --local]
+
+Without --queries, a sample of the memories themselves is used as queries.
+--local runs against an in-process Qdrant (no server needed; latencies are
+then only comparable with each other).
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams, models
+
+import config
+from memory_ingestion import load_memories
+from multivector_pooling import pool_multivector
+
+BENCHMARK_COLLECTION = "colbert_pooling_benchmark"
+
+
+def _percentile(values, percentile):
+    values = sorted(values)
+    return values[min(int(len(values) * percentile), len(values) - 1)]
+
+
+def run_pool_factor(client, pool_factor, document_embeddings, query_embeddings, top_k):
+    """Store the (pooled) documents in a fresh collection and time the queries."""
+    collection = f"{BENCHMARK_COLLECTION}_{pool_factor}"
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    client.create_collection(
+        collection,
+        vectors_config={
+            "late_interaction_embedding": VectorParams(
+                size=config.LATE_INTERACTION_VECTOR_SIZE,
+                distance=Distance.COSINE,
+                multivector_config=models.MultiVectorConfig(comparator=models.MultiVectorComparator.MAX_SIM),
+                hnsw_config=models.HnswConfigDiff(m=0),
+            )
+        },
+    )
+
+    start_time = time.perf_counter()
+    pooled = [pool_multivector(embedding, pool_factor=pool_factor, max_vectors=0) for embedding in document_embeddings]
+    pooling_ms = (time.perf_counter() - start_time) * 1000
+
+    client.upload_points(
+        collection,
+        points=[
+            PointStruct(id=i, vector={"late_interaction_embedding": embedding.tolist()})
+            for i, embedding in enumerate(pooled)
+        ],
+        wait=True,
+    )
+
+    rankings, latencies = [], []
+    for query in query_embeddings:
+        start_time = time.perf_counter()
+        result = client.query_points(collection, query=query.tolist(), using="late_interaction_embedding", limit=top_k)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        rankings.append([point.id for point in result.points])
+
+    client.delete_collection(collection)
+
+    stored_vectors = sum(len(embedding) for embedding in pooled)
+    return rankings, {
+        "pool_factor": pool_factor,
+        "vectors_per_memory": round(stored_vectors / len(pooled), 1),
+        "storage_mb": round(stored_vectors * config.LATE_INTERACTION_VECTOR_SIZE * 4 / 1e6, 2),
+        "pooling_ms_per_memory": round(pooling_ms / len(pooled), 2),
+        "query_p50_ms": round(statistics.median(latencies), 2),
+        "query_p95_ms": round(_percentile(latencies, 0.95), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pooled and uncompressed ColBERT multivectors.")
+    parser.add_argument("--memories", required=True, help="Memories file (any format memory_ingestion accepts)")
+    parser.add_argument("--queries", help="Text file with one query per line")
+    parser.add_argument("--num-queries", type=int, default=50, help="Memories sampled as queries when --queries is not given")
+    parser.add_argument("--pool-factors", default="1,2,3,4")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--url", default=f"{config.QDRANT_HOST}:{config.QDRANT_PORT}")
+    parser.add_argument("--local", action="store_true", help="Use an in-process Qdrant instead of the server")
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    from fastembed import LateInteractionTextEmbedding
+
+    texts = [memory[1] for memory in load_memories(args.memories)]
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = random.Random(0).sample(texts, min(args.num_queries, len(texts)))
+    pool_factors = sorted({1, *(int(factor) for factor in args.pool_factors.split(","))})
+
+    model = LateInteractionTextEmbedding(config.LATE_INTERACTION_EMBEDDING_MODEL_NAME)
+    print(f"Embedding {len(texts)} memories and {len(queries)} queries...")
+    document_embeddings = list(model.embed(texts))
+    query_embeddings = list(model.query_embed(queries))
+
+    client = QdrantClient(location=":memory:") if args.local else QdrantClient(url=args.url)
+
+    results = []
+    baseline = None
+    for pool_factor in pool_factors:
+        rankings, result = run_pool_factor(client, pool_factor, document_embeddings, query_embeddings, args.top_k)
+        if baseline is None:
+            baseline = rankings
+        result[f"recall@{args.top_k}"] = round(statistics.mean(
+            len(set(ranking) & set(expected)) / max(len(expected), 1) for ranking, expected in zip(rankings, baseline)
+        ), 3)
+        results.append(result)
+        print(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"memories": len(texts), "queries": len(queries), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
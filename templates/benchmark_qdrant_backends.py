@@ -0,0 +1,142 @@
+"""
+Embedded vs server Qdrant: startup time, memory and query latency.
+
+Runs the same synthetic memory workload as benchmark_qdrant_transport
+against both storage backends:
+
+  server    the bundled Qdrant binary (started with QdrantManager when
+            --start-server is given, otherwise an already running server)
+  embedded  qdrant-client local mode in this process, on a temporary directory
+
+Startup is the server launch until ready, or for embedded mode reopening the
+populated storage (local mode loads every point into memory when opened).
+Memory is the server process RSS, or the growth of this process's RSS for
+embedded mode. RSS is read from /proc, so it is only reported on Linux.
+
+Usage:
+    python benchmark_qdrant_backends.py [--backends server,embedded] [--start-server]
+        [--points 500] [--queries 200] [--output results.json]
+
+Pick "embedded" (COMPANIO_QDRANT_MODE=embedded) where its query latency at the
+install's memory count is acceptable; it saves the server's startup and memory.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import config
+from benchmark_qdrant_transport import BENCHMARK_COLLECTION, add_workload_arguments, query_latencies, upsert_synthetic
+from qdrant_collection import collection_profile, create_collection
+from qdrant_connection import create_qdrant_client
+
+
+def _rss_mb(pid: int) -> float | None:
+    """Resident memory of a process in MB, or None where /proc isn't available."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+async def run_server(args) -> dict:
+    rng = np.random.default_rng(0)
+    collection = f"{BENCHMARK_COLLECTION}_server"
+
+    qdrant_manager = None
+    startup_ms = None
+    if args.start_server:
+        from qdrant_manager import QdrantManager
+        qdrant_manager = QdrantManager()
+        start_time = time.perf_counter()
+        if not qdrant_manager.start_server():
+            raise RuntimeError("Qdrant server failed to start")
+        startup_ms = (time.perf_counter() - start_time) * 1000
+
+    client = create_qdrant_client(mode="server")
+    try:
+        if await client.collection_exists(collection):
+            await client.delete_collection(collection)
+        await create_collection(client, collection_profile(args.profile), collection_name=collection)
+        await upsert_synthetic(client, collection, rng, args)
+
+        result = {
+            "backend": "server",
+            "transport": config.QDRANT_TRANSPORT,
+            "startup_ms": round(startup_ms, 2) if startup_ms is not None else None,
+            **await query_latencies(client, collection, rng, args),
+            "rss_mb": _rss_mb(qdrant_manager.process.pid) if qdrant_manager else None,
+        }
+        await client.delete_collection(collection)
+        return result
+    finally:
+        await client.close()
+        if qdrant_manager is not None:
+            qdrant_manager.stop_server()
+
+
+async def run_embedded(args) -> dict:
+    rng = np.random.default_rng(0)
+    collection = f"{BENCHMARK_COLLECTION}_embedded"
+
+    with tempfile.TemporaryDirectory() as path:
+        rss_before = _rss_mb(os.getpid())
+
+        client = create_qdrant_client(mode="embedded", path=path)
+        await create_collection(client, collection_profile(args.profile), collection_name=collection)
+        await upsert_synthetic(client, collection, rng, args)
+        await client.close()
+
+        # What the app pays on startup once the store holds args.points memories
+        start_time = time.perf_counter()
+        client = create_qdrant_client(mode="embedded", path=path)
+        await client.get_collections()
+        startup_ms = (time.perf_counter() - start_time) * 1000
+
+        try:
+            result = {
+                "backend": "embedded",
+                "startup_ms": round(startup_ms, 2),
+                **await query_latencies(client, collection, rng, args),
+            }
+            rss_after = _rss_mb(os.getpid())
+            result["rss_mb"] = round(rss_after - rss_before, 1) if rss_before is not None else None
+            return result
+        finally:
+            await client.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare embedded and server Qdrant backends.")
+    parser.add_argument("--backends", default="server,embedded")
+    parser.add_argument("--start-server", action="store_true", help="Launch the bundled Qdrant binary and time its startup")
+    add_workload_arguments(parser)
+    args = parser.parse_args()
+
+    runners = {"server": run_server, "embedded": run_embedded}
+    results = []
+    for backend in args.backends.split(","):
+        result = await runners[backend.strip()](args)
+        results.append(result)
+        print(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "points": args.points,
+                "queries": args.queries,
+                "profile": args.profile,
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Allocation and time cost of building Qdrant store/search payloads.
+
+Measures, per memory point and per search query, the wall time and the
+Python heap allocated (tracemalloc peak) to turn numpy embeddings into what
+the client puts on the wire:
+
+  store:
+    dict_json     PointStruct with nested lists and a dict-built sparse vector, as JSON (REST)
+    dict_grpc     the same point, converted by the client to gRPC
+    numpy_model   PointStruct validated straight from the numpy arrays (pydantic copies them)
+    point_json    qdrant_payloads.memory_point (one tolist() per array), as JSON
+    point_grpc    qdrant_payloads.memory_point, converted by the client to gRPC
+  search:
+    dict_sparse   SparseVector(**embedding.as_object()) and a numpy dense query
+    list_sparse   qdrant_payloads.sparse_vector and a flat list dense query
+
+Vectors are synthetic with realistic shapes, so no server or models are needed.
+
+Usage:
+    python benchmark_qdrant_payloads.py [--tokens 60] [--sparse-terms 20] [--repeat 500]
+"""
+import argparse
+import time
+import tracemalloc
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+from qdrant_client.conversions.conversion import RestToGrpc
+from qdrant_client.models import PointStruct, models
+
+import config
+from qdrant_payloads import memory_point, sparse_vector
+
+
+def measure(fn, repeat: int) -> dict:
+    """Average wall time over `repeat` calls, plus the tracemalloc peak of one call."""
+    fn()
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed_ms = (time.perf_counter() - start_time) * 1000 / repeat
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": round(elapsed_ms, 3), "peak_kb": round(peak / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Qdrant payload serialization cost.")
+    parser.add_argument("--tokens", type=int, default=60, help="ColBERT vectors per memory")
+    parser.add_argument("--sparse-terms", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dense = rng.normal(size=config.DENSE_VECTOR_SIZE).astype(np.float32)
+    multivector = rng.normal(size=(args.tokens, config.LATE_INTERACTION_VECTOR_SIZE)).astype(np.float32)
+    sparse = SimpleNamespace(
+        indices=np.sort(rng.choice(100_000, args.sparse_terms, replace=False)),
+        values=rng.random(args.sparse_terms).astype(np.float32),
+    )
+    sparse.as_object = lambda: {"indices": sparse.indices, "values": sparse.values}
+    payload = {"memory_text": "I used to grow roses with my sister.", "category": "preference", "timestamp": "2025-01-01T00:00:00Z"}
+
+    def rest_point():
+        return PointStruct(
+            id=str(uuid.uuid4()),
+            payload=payload,
+            vector={
+                "dense_embedding": dense.tolist(),
+                "bm25_embedding": models.SparseVector(**sparse.as_object()),
+                "late_interaction_embedding": multivector.tolist(),
+            },
+        )
+
+    def numpy_point():
+        return PointStruct(
+            id=str(uuid.uuid4()),
+            payload=payload,
+            vector={
+                "dense_embedding": dense,
+                "bm25_embedding": models.SparseVector(indices=sparse.indices, values=sparse.values),
+                "late_interaction_embedding": multivector,
+            },
+        )
+
+    def payload_point():
+        return memory_point(str(uuid.uuid4()), payload, dense, sparse, multivector)
+
+    store = {
+        "dict_json": lambda: rest_point().model_dump_json(),
+        "dict_grpc": lambda: RestToGrpc.convert_point_struct(rest_point()).SerializeToString(),
+        "numpy_model": numpy_point,
+        "point_json": lambda: payload_point().model_dump_json(),
+        "point_grpc": lambda: RestToGrpc.convert_point_struct(payload_point()).SerializeToString(),
+    }
+    search = {
+        "dict_sparse": lambda: (
+            models.Prefetch(query=dense, using="dense_embedding", limit=10),
+            models.Prefetch(query=models.SparseVector(**sparse.as_object()), using="bm25_embedding", limit=10),
+        ),
+        "list_sparse": lambda: (
+            models.Prefetch(query=dense.tolist(), using="dense_embedding", limit=10),
+            models.Prefetch(query=sparse_vector(sparse), using="bm25_embedding", limit=10),
+        ),
+    }
+
+    print(f"Per memory point ({args.tokens} ColBERT vectors, {args.sparse_terms} sparse terms):")
+    for name, fn in store.items():
+        print(f"  store  {name:<13} {measure(fn, args.repeat)}")
+    print("Per search query:")
+    for name, fn in search.items():
+        print(f"  search {name:<13} {measure(fn, args.repeat)}")
+
+
+if __name__ == "__main__":
+    main()
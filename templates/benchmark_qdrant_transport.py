@@ -0,0 +1,175 @@
+"""
+REST vs gRPC latency of the Qdrant client as the app uses it.
+
+For each transport, connects an AsyncQdrantClient with the settings from
+qdrant_connection, creates a temporary collection with the memory layout,
+upserts synthetic memory points in ingestion-sized batches and runs the
+memory search queries (dense + sparse prefetch with ColBERT rerank, and the
+dense-rescored fast path). Reports connect time and p50/p95 latencies per operation.
+
+Vectors are synthetic with realistic shapes, so no models are needed, but a
+running Qdrant server is (both ports, as written by QdrantManager).
+
+Usage:
+    python benchmark_qdrant_transport.py [--transports rest,grpc] [--points 500]
+        [--queries 200] [--idle 0] [--output results.json]
+
+--idle waits that many seconds before one more query, to see what the first
+request after a quiet period costs (gRPC keepalive keeps the channel open).
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+from qdrant_client.models import models
+
+import config
+from qdrant_collection import collection_profile, create_collection, dense_search_params
+from qdrant_connection import create_qdrant_client
+from qdrant_payloads import memory_point, sparse_vector
+
+BENCHMARK_COLLECTION = "transport_benchmark"
+
+
+def _percentile(values, percentile):
+    values = sorted(values)
+    return values[min(int(len(values) * percentile), len(values) - 1)]
+
+
+def _latencies(name, values) -> dict:
+    return {
+        f"{name}_p50_ms": round(statistics.median(values), 2),
+        f"{name}_p95_ms": round(_percentile(values, 0.95), 2),
+    }
+
+
+def synthetic_memory(rng, tokens: int, sparse_terms: int):
+    """Dense, sparse and ColBERT embeddings shaped like the real models' output."""
+    dense = rng.normal(size=config.DENSE_VECTOR_SIZE).astype(np.float32)
+    sparse = SimpleNamespace(
+        indices=np.sort(rng.choice(100_000, sparse_terms, replace=False)),
+        values=rng.random(sparse_terms).astype(np.float32),
+    )
+    multivector = rng.normal(size=(tokens, config.LATE_INTERACTION_VECTOR_SIZE)).astype(np.float32)
+    return dense, sparse, multivector
+
+
+async def upsert_synthetic(client, collection: str, rng, args) -> list:
+    """Upsert args.points synthetic memories in ingestion-sized batches; returns per-batch latencies (ms)."""
+    latencies = []
+    for batch_start in range(0, args.points, config.INGEST_BATCH_SIZE):
+        batch_size = min(config.INGEST_BATCH_SIZE, args.points - batch_start)
+        points = [
+            memory_point(
+                str(uuid.uuid4()),
+                {"memory_text": f"Synthetic memory {batch_start + i}", "category": "other"},
+                *synthetic_memory(rng, args.tokens, args.sparse_terms),
+            )
+            for i in range(batch_size)
+        ]
+        start_time = time.perf_counter()
+        await client.upsert(collection, points=points, wait=True)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    return latencies
+
+
+async def time_query(client, collection: str, rng, args, rerank: bool) -> float:
+    """One memory search as search_memory_local runs it (ColBERT rerank or dense rescoring); returns latency (ms)."""
+    dense, sparse, multivector = synthetic_memory(rng, args.query_tokens, args.sparse_terms)
+    prefetch = [
+        models.Prefetch(query=dense.tolist(), using="dense_embedding", params=dense_search_params(), limit=10),
+        models.Prefetch(query=sparse_vector(sparse), using="bm25_embedding", limit=10),
+    ]
+    start_time = time.perf_counter()
+    if rerank:
+        await client.query_points(
+            collection, prefetch=prefetch, query=multivector, using="late_interaction_embedding",
+            with_payload=True, limit=config.MEMORY_SEARCH_TOP_K,
+        )
+    else:
+        await client.query_points(
+            collection, prefetch=prefetch, query=dense.tolist(), using="dense_embedding",
+            score_threshold=config.MEMORY_DENSE_SCORE_THRESHOLD, with_payload=True, limit=config.MEMORY_SEARCH_TOP_K,
+        )
+    return (time.perf_counter() - start_time) * 1000
+
+
+async def query_latencies(client, collection: str, rng, args) -> dict:
+    reranked = [await time_query(client, collection, rng, args, rerank=True) for _ in range(args.queries)]
+    rescored = [await time_query(client, collection, rng, args, rerank=False) for _ in range(args.queries)]
+    return {**_latencies("query_rerank", reranked), **_latencies("query_dense", rescored)}
+
+
+def add_workload_arguments(parser: argparse.ArgumentParser):
+    """Arguments shared with benchmark_qdrant_backends."""
+    parser.add_argument("--points", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--tokens", type=int, default=60, help="ColBERT vectors per memory")
+    parser.add_argument("--query-tokens", type=int, default=32, help="ColBERT vectors per query")
+    parser.add_argument("--sparse-terms", type=int, default=20)
+    parser.add_argument("--profile", default=config.QDRANT_COLLECTION_PROFILE, choices=list(config.QDRANT_COLLECTION_PROFILES))
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+
+
+async def run_transport(transport: str, args) -> dict:
+    rng = np.random.default_rng(0)
+    collection = f"{BENCHMARK_COLLECTION}_{transport}"
+
+    start_time = time.perf_counter()
+    client = create_qdrant_client(transport, mode="server")
+    await client.get_collections()
+    connect_ms = (time.perf_counter() - start_time) * 1000
+
+    try:
+        if await client.collection_exists(collection):
+            await client.delete_collection(collection)
+        await create_collection(client, collection_profile(args.profile), collection_name=collection)
+
+        upserts = await upsert_synthetic(client, collection, rng, args)
+        result = {
+            "transport": transport,
+            "connect_ms": round(connect_ms, 2),
+            **_latencies("upsert_batch", upserts),
+            **await query_latencies(client, collection, rng, args),
+        }
+        if args.idle:
+            await asyncio.sleep(args.idle)
+            result["query_after_idle_ms"] = round(await time_query(client, collection, rng, args, rerank=True), 2)
+
+        await client.delete_collection(collection)
+        return result
+    finally:
+        await client.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare Qdrant REST and gRPC transport latency.")
+    parser.add_argument("--transports", default="rest,grpc")
+    parser.add_argument("--idle", type=float, default=0, help="Seconds to wait before one more query")
+    add_workload_arguments(parser)
+    args = parser.parse_args()
+
+    results = []
+    for transport in args.transports.split(","):
+        result = await run_transport(transport.strip(), args)
+        results.append(result)
+        print(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "host": config.QDRANT_HOST,
+                "points": args.points,
+                "queries": args.queries,
+                "profile": args.profile,
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
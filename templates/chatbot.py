@@ -1,14 +1,20 @@
 import asyncio
+import contextlib
+import time
 
 from semantic_kernel.functions import KernelArguments
 from semantic_kernel.contents import AuthorRole
 from semantic_kernel.contents.chat_message_content import ChatMessageContent
-from kernel_manager import setup_kernel
-from azure_search_manager import search_memory, store_memory
-from qdrant_search_manager import search_memory_local, store_memory_local
+from kernel_manager import setup_kernel, CHAT_PROMPT_TEMPLATE
+from azure_search_manager import search_memory
+from qdrant_search_manager import search_memory_local
+from memory_writer import memory_write_queue, categorize_input
+from context_packer import get_token_counter, pack_context
 import config
 from offline_memory import load_chat_history, save_chat_history
-from semantic_kernel.contents import ChatHistoryTruncationReducer
+from session_manager import SessionManager
+from history_summarizer import history_summarizer
+from speech_pipeline import SentenceSegmenter, SpeechPlayer
 
 # Import speech-to-text conditionally based on runtime mode
 if not config.RUNNING_AS_SERVER:
@@ -27,11 +33,7 @@ else:
         print("Speech-to-text not available in server mode")
         return None, False
 
-# Import text-to-speech for all runtimes
-if not config.USE_OLLAMA and config.USE_SPEECH_OUTPUT:
-    from azure_text_to_speech import text_to_speech
-if config.USE_OLLAMA and config.USE_SPEECH_OUTPUT:
-    from offline_text_to_speech import speak_text
+# Text-to-speech engines are imported by speech_pipeline when first used
     
 # Don't run setup_kernel() immediately
 kernel = None
@@ -39,33 +41,62 @@ chat_function = None
 chat_history = None
 model_name = None
 
-# Initialize the chat history as truncation reducer
-truncation_reducer = ChatHistoryTruncationReducer(target_count=10)
+# Per-session chat histories (truncation reducers and rolling summaries), shared kernel
+session_manager = SessionManager()
+
+# Guards kernel (re)initialisation so concurrent callers build it only once
+_init_lock = asyncio.Lock()
 
 async def initialize_chatbot():
     """Initialize the chatbot lazily when needed."""
     global kernel, chat_function, model_name
-    if kernel is None:
-        kernel, chat_function, model_name = await setup_kernel()
-        print("Welcome to your Companion Chatbot!")
+    if kernel is not None:
+        return
+    async with _init_lock:
+        if kernel is None:
+            kernel, chat_function, model_name = await setup_kernel()
+            print("Welcome to your Companion Chatbot!")
+            print(f"Currently using {model_name}.")
+            if not config.USE_SPEECH_INPUT:
+                print("Type 'exit' or 'quit' to stop.\n")
+
+async def reload_chatbot():
+    """Rebuild the kernel for the current config and swap it in.
+
+    Loaded embedding models and clients are reused from the service registry,
+    so only the chat-completion service changes. Requests already in flight
+    keep the kernel they started with; conversation histories are kept.
+    """
+    global kernel, chat_function, model_name
+    async with _init_lock:
+        new_kernel, new_chat_function, new_model_name = await setup_kernel()
+        kernel, chat_function, model_name = new_kernel, new_chat_function, new_model_name
         print(f"Currently using {model_name}.")
-        if not config.USE_SPEECH_INPUT:
-            print("Type 'exit' or 'quit' to stop.\n")
-
-def categorize_input(user_input):
-    """Classify the type of input dynamically."""
-    user_input_lower = user_input.lower()
-
-    # If it contains a question mark, assume it's a question
-    if "?" in user_input_lower:
-        return "question"
-
-    # If it mentions preferences, assume it's a preference
-    if any(word in user_input_lower for word in ["like", "love", "enjoy", "favorite", "prefer"]):
-        return "preference"
 
-    # Otherwise, treat it as a general conversation
-    return "chat_interaction"
+async def retrieve_memories(kernel, user_input: str) -> list:
+    """Search for memories relevant to the input, best first (only those that pass the relevance gate)."""
+    if "collection" in kernel.services:
+        return await search_memory(kernel, query=user_input)
+    if "qdrant_client" in kernel.services:
+        return await search_memory_local(kernel, query=user_input)
+    return []
+
+def build_chat_arguments(session, user_input: str, memories) -> tuple:
+    """Pack the session's history and summary, memories and input into the prompt token budget.
+
+    Returns (KernelArguments for the Chat function, packing stats).
+    """
+    arguments, stats = pack_context(
+        get_token_counter(),
+        CHAT_PROMPT_TEMPLATE,
+        config.SYSTEM_MESSAGE,
+        user_input,
+        session.truncation_reducer.messages,
+        memories,
+        summary=session.history_summary,
+        budget=config.CONTEXT_TOKEN_BUDGET,
+    )
+    return KernelArguments(**arguments), stats
 
 async def chat():
     """Handles the chatbot conversation loop."""
@@ -99,35 +130,23 @@ async def chat():
         return False
 
     # Add the user message to the truncation reducer and reduce the chat history if needed
+    session = session_manager.get(config.DEFAULT_SESSION_ID)
+    truncation_reducer = session.truncation_reducer
     truncation_reducer.add_user_message(user_input)
     await truncation_reducer.reduce()
 
-    # **Retrieve previous memories if available**
-    memory_results = []
-    if "collection" in kernel.services:
-        memory_results = await search_memory(kernel, query=user_input)
-    elif "qdrant_client" in kernel.services:
-        memory_results = await search_memory_local(kernel, query=user_input)
-
-    # **Update the chat history with past memories (if available)**
-    if memory_results:
-        past_memory = "\n\n[Past Memories that MAY be useful]:\n" + "\n".join(memory_results) + "\n"
-    else:
-        past_memory = ""
+    # **Retrieve relevant previous memories (if available) and fit the prompt into the token budget**
+    memories = await retrieve_memories(kernel, user_input)
+    chat_arguments, _ = build_chat_arguments(session, user_input, memories)
 
     # **Invoke the chatbot function**
     try:
         answer = ""
         first_chunk = True  # Track whether it's the first chunk
-        async for chunk in kernel.invoke_stream(
-            chat_function, 
-            KernelArguments(
-                truncation_reducer=truncation_reducer,
-                user_input=user_input,
-                past_memory=past_memory,
-                system_message = config.SYSTEM_MESSAGE
-            )
-        ):
+        # Speak each sentence as soon as it is complete, while generation continues
+        speech_player = SpeechPlayer() if config.USE_SPEECH_OUTPUT else None
+        segmenter = SentenceSegmenter()
+        async for chunk in kernel.invoke_stream(chat_function, chat_arguments):
             if not isinstance(chunk, list):
                 continue
 
@@ -141,15 +160,17 @@ async def chat():
                 if not (config.USE_OLLAMA and config.USE_SPEECH_OUTPUT):
                     print(new_text, end="", flush=True)
                 answer += new_text
+                if speech_player is not None:
+                    for sentence in segmenter.feed(new_text):
+                        speech_player.say(sentence)
                 
             
-        if not config.USE_OLLAMA and config.USE_SPEECH_OUTPUT:
-            text_to_speech(answer)  # Process full response at once
-            
-
-        if config.USE_OLLAMA and config.USE_SPEECH_OUTPUT:
-            print(answer)
-            speak_text(text=answer)
+        if speech_player is not None:
+            for sentence in segmenter.flush():
+                speech_player.say(sentence)
+            if config.USE_OLLAMA:
+                print(answer)
+            await speech_player.finish()
             
 
         """ To artificially slow down streaming (optional), comment/uncomment the following line: """
@@ -159,16 +180,15 @@ async def chat():
 
         # Add the assistant message to the truncation reducer
         truncation_reducer.add_assistant_message(answer)
+        # Fold turns that left the history window into the summary, in the background
+        history_summarizer.schedule(kernel, session)
 
         # Categorise the input 
         category = categorize_input(user_input)
         
         # Only store past memories if the input is not a question
         if category != "question":
-            if "collection" in kernel.services:
-                await store_memory(kernel, user_id=config.USER_ID, memory_text=user_input, category=category)
-            elif "qdrant_client" in kernel.services:
-                await store_memory_local(kernel, user_id=config.USER_ID, memory_text=user_input, category=category)
+            await memory_write_queue.submit(kernel, user_id=config.USER_ID, memory_text=user_input, category=category)
 
         # ✅ Save new chat history **only for Ollama**
 #         if USE_OLLAMA:
@@ -182,44 +202,51 @@ async def chat():
 
     return True  # Return after processing the entire message
 
-async def process_message(user_input: str) -> str:
-    """Process a single message and return the response as a string.
-    This function is designed for API integration."""
-    
+async def stream_message(user_input: str, session_id: str | None = None):
+    """Process a single message and yield the response as it is generated.
+    This function is designed for streaming API integration.
+
+    Each session keeps its own chat history. Turns within one session are
+    processed in order; different sessions are processed concurrently.
+
+    Yields dict events:
+      - {"type": "delta", "content": <text>} for every chunk from the model.
+      - {"type": "done", "response": <full answer>, "timings": {...}, "context": {...}} once finished.
+      - {"type": "error", "message": <error>} if generation fails.
+    """
+    start_time = time.perf_counter()
+
     await initialize_chatbot()
-    
+
     if not user_input:
-        return "No input detected. Please try again."
-    
-    # Add the user message to the truncation reducer
-    truncation_reducer.add_user_message(user_input)
-    await truncation_reducer.reduce()
+        yield {"type": "error", "message": "No input detected. Please try again."}
+        return
 
-    # Retrieve previous memories if available
-    memory_results = []
-    if "collection" in kernel.services:
-        memory_results = await search_memory(kernel, query=user_input)
-    elif "qdrant_client" in kernel.services:
-        memory_results = await search_memory_local(kernel, query=user_input)
+    session = session_manager.get(session_id)
+    async with session.turn():
+        # Pin the current kernel so a config reload mid-turn doesn't affect this request
+        async for event in _stream_turn(kernel, chat_function, session, user_input, start_time):
+            yield event
 
-    # Update with past memories (if available)
-    if memory_results:
-        past_memory = "\n\n[Past Memories that MAY be useful]:\n" + "\n".join(memory_results) + "\n"
-    else:
-        past_memory = ""
+async def _stream_turn(kernel, chat_function, session, user_input: str, start_time: float):
+    """Run one conversation turn against the given kernel and session history."""
+    truncation_reducer = session.truncation_reducer
 
-    # Process the message
     try:
+        # Add the user message to the truncation reducer
+        truncation_reducer.add_user_message(user_input)
+        await truncation_reducer.reduce()
+
+        # Retrieve relevant previous memories (if available) and fit the prompt into the token budget
+        memories = await retrieve_memories(kernel, user_input)
+        chat_arguments, context_stats = build_chat_arguments(session, user_input, memories)
+
+        retrieval_done = time.perf_counter()
+        first_token_time = None
+
+        # Process the message
         answer = ""
-        async for chunk in kernel.invoke_stream(
-            chat_function, 
-            KernelArguments(
-                truncation_reducer=truncation_reducer,
-                user_input=user_input,
-                past_memory=past_memory,
-                system_message=config.SYSTEM_MESSAGE
-            )
-        ):
+        async for chunk in kernel.invoke_stream(chat_function, chat_arguments):
             if not isinstance(chunk, list):
                 continue
 
@@ -228,30 +255,54 @@ async def process_message(user_input: str) -> str:
                     continue
                     
                 new_text = msg.items[0].text
+                if not new_text:
+                    continue
+                if first_token_time is None:
+                    first_token_time = time.perf_counter()
                 answer += new_text
+                yield {"type": "delta", "content": new_text}
+
+        generation_done = time.perf_counter()
 
         # Add the assistant message to the truncation reducer
         truncation_reducer.add_assistant_message(answer)
+        # Fold turns that left the history window into the summary, in the background
+        history_summarizer.schedule(kernel, session)
 
-        # Categorize and store memories if needed
+        # Categorize and queue memories for background storage if needed
         category = categorize_input(user_input)
         if category != "question":
-            if "collection" in kernel.services:
-                await store_memory(kernel, user_id=config.USER_ID, memory_text=user_input, category=category)
-            elif "qdrant_client" in kernel.services:
-                await store_memory_local(kernel, user_id=config.USER_ID, memory_text=user_input, category=category)
-
-        return answer
+            await memory_write_queue.submit(kernel, user_id=config.USER_ID, memory_text=user_input, category=category)
+
+        end_time = time.perf_counter()
+        yield {
+            "type": "done",
+            "response": answer,
+            "timings": {
+                "retrieval_ms": round((retrieval_done - start_time) * 1000, 1),
+                "first_token_ms": round((first_token_time - start_time) * 1000, 1) if first_token_time else None,
+                "generation_ms": round((generation_done - retrieval_done) * 1000, 1),
+                "total_ms": round((end_time - start_time) * 1000, 1),
+            },
+            "context": context_stats,
+        }
 
     except Exception as e:
-        return f"Error processing message: {str(e)}"
+        yield {"type": "error", "message": f"Error processing message: {str(e)}"}
+
+async def process_message(user_input: str, session_id: str | None = None) -> str:
+    """Process a single message and return the response as a string.
+    This function is designed for API integration."""
     
-def reset_chatbot_state():
-    """Reset the chatbot's global state variables to force reinitialization."""
-    global kernel, chat_function, model_name
-    kernel = None
-    chat_function = None
-    model_name = None
-    # Reset the truncation reducer too to start a fresh conversation
-    global truncation_reducer
-    truncation_reducer = ChatHistoryTruncationReducer(target_count=10)
\ No newline at end of file
+    if not user_input:
+        return "No input detected. Please try again."
+
+    # Close the stream on early return so its turn lock is released right away
+    async with contextlib.aclosing(stream_message(user_input, session_id=session_id)) as events:
+        async for event in events:
+            if event["type"] == "done":
+                return event["response"]
+            if event["type"] == "error":
+                return event["message"]
+
+    return ""
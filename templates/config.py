@@ -22,20 +22,144 @@ AVAILABLE_OLLAMA_MODELS = {
     "2": "granite3.1-dense:2b"
 }
 
+# Session Settings
+DEFAULT_SESSION_ID = "default"
+CHAT_HISTORY_TARGET_COUNT = 10  # Messages kept per session by the truncation reducer
+SESSION_MAX_COUNT = 100  # Least recently used sessions are evicted beyond this
+SESSION_TTL_SECONDS = 60 * 60  # Idle sessions are evicted after this
+SESSION_MAX_TOTAL_CHARS = 5_000_000  # Memory cap across all session histories
+
+# History Summarization Settings
+HISTORY_SUMMARY_ENABLED = True  # Fold turns older than the history window into a rolling summary
+HISTORY_SUMMARY_BATCH_MESSAGES = 4  # Summarize once this many messages are past the window
+HISTORY_SUMMARY_MAX_BACKLOG = 12  # Messages past the window before old turns are dropped unsummarized
+HISTORY_SUMMARY_MAX_TOKENS = 150  # Length limit for the generated summary
+
+# Memory Write-Behind Queue Settings
+MEMORY_WRITE_QUEUE_SIZE = 1000  # Memories beyond this are dropped instead of blocking
+MEMORY_WRITE_BATCH_SIZE = 16
+MEMORY_WRITE_MAX_RETRIES = 3
+MEMORY_WRITE_RETRY_DELAY = 1.0  # Seconds, doubled after each failed attempt
+MEMORY_WRITE_FLUSH_TIMEOUT = 30.0  # Seconds to wait for pending writes at shutdown
+
+# Bulk Memory Ingestion Settings
+INGEST_BATCH_SIZE = 64  # Memories embedded and uploaded together
+INGEST_CONCURRENCY = 2  # Batches in flight, so uploads overlap with embedding
+INGEST_MAX_REQUEST_MEMORIES = 5000  # Per POST /api/memories/bulk; larger imports use memory_ingestion.py
+
+# Text-to-Speech Voices
+COQUI_TTS_MODEL = "tts_models/en/vctk/vits"
+COQUI_TTS_VOICES = {"male": "p229", "female": "p240"}
+AZURE_TTS_VOICES = {"male": "en-US-GuyNeural", "female": "en-US-JennyNeural"}
+
+# Azure Speech Synthesizer Pool Settings
+AZURE_TTS_POOL_SIZE = 2  # Idle pre-connected synthesizers kept per voice
+AZURE_TTS_POOL_IDLE_SECONDS = 300  # Idle synthesizers are closed after this
+
+# Streaming Speech Settings
+TTS_MIN_SENTENCE_CHARS = 12  # Shorter fragments are merged into the next sentence before synthesis
+
+# Synthesized Audio Cache Settings
+TTS_CACHE_MEMORY_BYTES = 32 * 1024 * 1024
+TTS_CACHE_DISK_BYTES = 256 * 1024 * 1024  # Set to 0 to disable the on-disk tier
+
 # Avatar Settings
 AVATAR_TYPE = "male"
 
 # Qdrant Settings
 QDRANT_HOST = "http://localhost"
 QDRANT_PORT = 6333
+QDRANT_GRPC_PORT = 6334  # Matches grpc_port in the config written by QdrantManager
+QDRANT_MODE = os.getenv("COMPANIO_QDRANT_MODE", "server")  # "server" (bundled binary) or "embedded" (in-process, for small single-user installs)
+QDRANT_EMBEDDED_PATH = os.getenv("COMPANIO_QDRANT_EMBEDDED_PATH")  # None: "embedded" in QdrantManager's qdrant directory
+QDRANT_STARTUP_TIMEOUT = 15  # Seconds to wait for a launched server to report ready
+QDRANT_TRANSPORT = os.getenv("COMPANIO_QDRANT_TRANSPORT", "grpc")  # "grpc" or "rest" (server mode only)
+QDRANT_GRPC_PROBE_TIMEOUT = 1.0  # Seconds to wait for the gRPC port before falling back to REST
+QDRANT_TIMEOUT = 10  # Seconds per request
+QDRANT_GRPC_KEEPALIVE_MS = 30_000  # Ping an idle gRPC channel this often to keep it open
+QDRANT_GRPC_KEEPALIVE_TIMEOUT_MS = 10_000  # Reconnect if a ping isn't answered within this
 QDRANT_COLLECTION = "chat_history"
 DENSE_VECTOR_SIZE = 768
 LATE_INTERACTION_VECTOR_SIZE = 128
 
+# Qdrant Collection Profiles: storage and index layout of the memory collection.
+# Used when the collection is created. Existing collections keep their layout
+# unless migrated with `python qdrant_collection.py --profile <name>` (or at
+# startup with QDRANT_MIGRATE_COLLECTION). See qdrant_collection.PROFILE_DEFAULTS.
+QDRANT_COLLECTION_PROFILE = os.getenv("COMPANIO_QDRANT_PROFILE", "low_memory")
+QDRANT_COLLECTION_PROFILES = {
+    # Qdrant defaults: every vector and index in RAM
+    "default": {},
+    # Int8 dense vectors in RAM with the originals on disk for rescoring; ColBERT
+    # multivectors on disk without an HNSW graph, since they only rerank prefetched candidates
+    "low_memory": {
+        "dense_quantization": "scalar",
+        "dense_on_disk": True,
+        "late_interaction_on_disk": True,
+        "late_interaction_hnsw": False,
+        "on_disk_payload": True,
+        "hnsw_m": 16,
+        "hnsw_ef_construct": 100,
+    },
+    # Smallest footprint: 1-bit dense vectors and the sparse index on disk too
+    "minimal_memory": {
+        "dense_quantization": "binary",
+        "dense_on_disk": True,
+        "late_interaction_on_disk": True,
+        "late_interaction_hnsw": False,
+        "sparse_on_disk": True,
+        "on_disk_payload": True,
+        "hnsw_m": 8,
+        "hnsw_ef_construct": 64,
+    },
+}
+QDRANT_MIGRATE_COLLECTION = False  # Apply the profile to an existing collection at startup (rebuilds its storage)
+QDRANT_QUANTIZATION_OVERSAMPLING = 2.0  # Extra quantized candidates fetched, then rescored with original vectors
+QDRANT_PAYLOAD_INDEXES = {"category": "keyword", "timestamp": "datetime"}
+
+# Inference Executor Settings
+INFERENCE_WORKERS = int(os.getenv("COMPANIO_INFERENCE_WORKERS", "2"))  # Threads for blocking model calls
+
+# Granite Dense Embedding Settings
+GRANITE_MAX_BATCH_SIZE = 32  # Texts per forward pass
+GRANITE_MAX_SEQ_LENGTH = 512  # Tokens per text, longer texts are truncated
+
 # FastEmbed Settings
 SPARSE_EMBEDDING_MODEL_NAME = "qdrant/bm25"
 LATE_INTERACTION_EMBEDDING_MODEL_NAME = "colbert-ir/colbertv2.0"
 
+# ColBERT Token Pooling (applied to stored multivectors before upsert; queries are not pooled)
+COLBERT_POOL_FACTOR = 1  # e.g. 2 keeps about half the token vectors per memory; 1 disables pooling
+COLBERT_MAX_VECTORS = None  # Optional cap on stored vectors per memory
+
+# Components listed here are loaded on first use instead of at startup.
+# Supported: "bm25_embedding_model", "late_interaction_embedding_model"
+DEFERRED_COMPONENTS = []
+
+# Memory Search Settings
+MEMORY_SEARCH_RERANK_MIN_POINTS = 20  # Below this collection size, rank dense + sparse candidates by dense similarity instead of ColBERT reranking
+MEMORY_SEARCH_COUNT_REFRESH_SECONDS = 60  # How often the cached collection size is refreshed
+MEMORY_SEARCH_LATENCY_BUDGET_MS = None  # e.g. 250; skip ColBERT reranking if its query embedding is not ready in time
+MEMORY_SEARCH_TOP_K = 5  # Most memories injected into the prompt
+MEMORY_SCORE_THRESHOLD = 0.55  # Minimum ColBERT score (mean max-similarity per query token, 0-1); None disables
+MEMORY_DENSE_SCORE_THRESHOLD = 0.6  # Minimum dense cosine similarity when ColBERT reranking is skipped; None disables
+MEMORY_SCORE_RELATIVE_CUTOFF = 0.8  # Drop memories scoring below this fraction of the best hit; None disables
+MEMORY_TOKEN_BUDGET = 300  # Tokens allowed for the past-memory block in the prompt
+
+# Prompt Context Packing Settings
+CONTEXT_TOKEN_BUDGET = 1536  # Prompt tokens per turn; Ollama's default context is 2048, leaving room for the reply
+CONTEXT_MIN_HISTORY_MESSAGES = 2  # Most recent history messages packed before memories
+# Tokenizers used to measure prompts for each chat model (falls back to a character estimate)
+OLLAMA_TOKENIZERS = {
+    "phi3.5:latest": "microsoft/Phi-3.5-mini-instruct",
+    "granite3.1-dense:2b": "ibm-granite/granite-3.1-2b-instruct",
+}
+AZURE_TOKENIZER = "tiktoken:o200k_base"
+
+# Query Embedding Cache Settings (shared across sessions)
+EMBEDDING_CACHE_MAX_ENTRIES = 512
+EMBEDDING_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
 # Azure OpenAI Settings
 AZURE_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
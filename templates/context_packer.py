@@ -0,0 +1,178 @@
+import threading
+
+from semantic_kernel.contents import AuthorRole, ChatHistory
+
+import config
+from memory_relevance import estimate_tokens, format_past_memory
+
+
+class TokenCounter:
+    """
+    Counts tokens with the active chat model's tokenizer.
+
+    tokenizer_name is a Hugging Face tokenizer id, or "tiktoken:<encoding>".
+    Until load() has run (normally during warm-up, on the inference executor)
+    or if the tokenizer is unavailable, counts fall back to estimate_tokens.
+    """
+
+    def __init__(self, tokenizer_name: str | None):
+        self.tokenizer_name = tokenizer_name
+        self._encode = None
+        self._load_failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._encode is not None
+
+    @property
+    def name(self) -> str:
+        return self.tokenizer_name if self.is_loaded else "estimate"
+
+    def load(self):
+        """Load the tokenizer (blocking; may download it on first use)."""
+        if self.tokenizer_name is None or self.is_loaded or self._load_failed:
+            return
+        with self._lock:
+            if self.is_loaded or self._load_failed:
+                return
+            try:
+                if self.tokenizer_name.startswith("tiktoken:"):
+                    import tiktoken
+
+                    encoding = tiktoken.get_encoding(self.tokenizer_name.split(":", 1)[1])
+                    self._encode = encoding.encode
+                else:
+                    from transformers import AutoTokenizer
+
+                    tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name)
+                    self._encode = lambda text: tokenizer.encode(text, add_special_tokens=False)
+            except Exception as e:
+                self._load_failed = True
+                print(f"Warning: could not load tokenizer {self.tokenizer_name}, context packing will use estimated token counts: {e}")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encode is None:
+            return estimate_tokens(text)
+        return len(self._encode(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text down to at most max_tokens, keeping the beginning."""
+        tokens = self.count(text)
+        while text and tokens > max_tokens:
+            text = text[:max(int(len(text) * max_tokens / tokens) - 1, 0)]
+            tokens = self.count(text)
+        return text
+
+
+_token_counters = {}
+
+
+def active_tokenizer_name() -> str | None:
+    """Tokenizer for the chat model selected in config (None if unknown)."""
+    if config.USE_OLLAMA:
+        return config.OLLAMA_TOKENIZERS.get(config.OLLAMA_MODEL_ID)
+    return config.AZURE_TOKENIZER
+
+
+def get_token_counter() -> TokenCounter:
+    """Shared TokenCounter for the active chat model."""
+    tokenizer_name = active_tokenizer_name()
+    counter = _token_counters.get(tokenizer_name)
+    if counter is None:
+        counter = _token_counters.setdefault(tokenizer_name, TokenCounter(tokenizer_name))
+    return counter
+
+
+def _message_tokens(counter: TokenCounter, message) -> int:
+    """Tokens a history message takes up once rendered into the prompt."""
+    return counter.count(message.to_prompt())
+
+
+def pack_context(
+    counter: TokenCounter,
+    template: str,
+    system_message: str,
+    user_input: str,
+    history_messages,
+    memories,
+    summary: str = "",
+    budget: int = config.CONTEXT_TOKEN_BUDGET,
+) -> tuple:
+    """
+    Fit one turn's prompt into the token budget.
+
+    Parts are added by priority until the budget is used up: the prompt
+    template and system message, the user input (trimmed if it alone
+    overflows), the most recent CONTEXT_MIN_HISTORY_MESSAGES history
+    messages, the rolling summary of earlier turns, relevant memories (best
+    first, within MEMORY_TOKEN_BUDGET), then older history, newest first. The current user message is not
+    repeated from the history since the template already includes it.
+
+    Returns (prompt arguments, stats), where the arguments are the
+    truncation_reducer / history_summary / user_input / past_memory /
+    system_message values for the ChatBot.Chat function.
+    """
+    history = list(history_messages)
+    if history and history[-1].role == AuthorRole.USER and str(history[-1].content) == user_input:
+        history = history[:-1]
+
+    used = counter.count(template) + counter.count(system_message)
+
+    user_tokens = counter.count(user_input)
+    user_input_truncated = used + user_tokens > budget
+    if user_input_truncated:
+        user_input = counter.truncate(user_input, max(budget - used, 0))
+        user_tokens = counter.count(user_input)
+    used += user_tokens
+
+    selected = []
+    index = len(history) - 1
+
+    def add_history(limit):
+        nonlocal used, index
+        while index >= 0 and len(selected) < limit:
+            message_tokens = _message_tokens(counter, history[index])
+            if used + message_tokens > budget:
+                return
+            selected.append(history[index])
+            used += message_tokens
+            index -= 1
+
+    add_history(config.CONTEXT_MIN_HISTORY_MESSAGES)
+
+    summary_tokens = counter.count(summary)
+    if used + summary_tokens > budget:
+        summary = counter.truncate(summary, max(budget - used, 0))
+        summary_tokens = counter.count(summary)
+    used += summary_tokens
+
+    memory_budget = min(config.MEMORY_TOKEN_BUDGET, max(budget - used, 0))
+    past_memory, memory_count, memory_tokens = format_past_memory(
+        memories, token_budget=memory_budget, count_tokens=counter.count
+    ) if memory_budget else ("", 0, 0)
+    used += memory_tokens
+
+    add_history(len(history))
+
+    arguments = {
+        "truncation_reducer": ChatHistory(messages=list(reversed(selected))),
+        "history_summary": summary,
+        "user_input": user_input,
+        "past_memory": past_memory,
+        "system_message": system_message,
+    }
+    stats = {
+        "prompt_tokens": used,
+        "budget": budget,
+        "tokenizer": counter.name,
+        "history_messages": len(selected),
+        "history_dropped": len(history) - len(selected),
+        "summary_tokens": summary_tokens,
+        "memories": memory_count,
+        "memory_tokens": memory_tokens,
+        "user_input_truncated": user_input_truncated,
+    }
+    return arguments, stats
@@ -0,0 +1,98 @@
+import re
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+import config
+
+
+def normalize_text(text: str) -> str:
+    """Normalize a query so trivially different phrasings share a cache entry."""
+    text = re.sub(r"[^\w\s']", " ", text.lower())
+    return " ".join(text.split())
+
+
+def _sizeof(value) -> int:
+    """Approximate memory used by a cached embedding, in bytes."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "indices") and hasattr(value, "values"):
+        # fastembed SparseEmbedding
+        return _sizeof(value.indices) + _sizeof(value.values)
+    if isinstance(value, (list, tuple)):
+        return sum(_sizeof(item) for item in value) or sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+class EmbeddingCache:
+    """
+    LRU cache of query embeddings keyed by (kind, normalized text).
+
+    Bounded by both entry count and total bytes. One instance is shared by
+    all sessions, so repeated questions skip the embedding models (and, in
+    Azure mode, the paid embedding call).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = config.EMBEDDING_CACHE_MAX_ENTRIES,
+        max_bytes: int = config.EMBEDDING_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, text: str):
+        key = (kind, normalize_text(text))
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, kind: str, text: str, value):
+        key = (kind, normalize_text(text))
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    async def get_or_compute(self, kind: str, text: str, compute):
+        """Return the cached embedding, or await compute() and cache its result."""
+        value = self.get(kind, text)
+        if value is None:
+            value = await compute()
+            self.put(kind, text, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+embedding_cache = EmbeddingCache()
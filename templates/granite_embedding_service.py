@@ -1,3 +1,4 @@
+import threading
 from typing import List, Any
 import numpy as np
 import torch
@@ -5,6 +6,8 @@ from pydantic import Field
 from transformers import AutoModel, AutoTokenizer
 from semantic_kernel.connectors.ai.embeddings.embedding_generator_base import EmbeddingGeneratorBase
 from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from config import GRANITE_MAX_BATCH_SIZE, GRANITE_MAX_SEQ_LENGTH
+from inference_executor import inference_executor
 
 class GraniteEmbeddingService(EmbeddingGeneratorBase):
     """A service that generates text embeddings using the Granite model."""
@@ -12,29 +15,66 @@ class GraniteEmbeddingService(EmbeddingGeneratorBase):
     service_id: str
     ai_model_id: str
     device: str = Field(default="cpu", exclude=True)
+    max_batch_size: int = Field(default=GRANITE_MAX_BATCH_SIZE, exclude=True)
+    max_seq_length: int = Field(default=GRANITE_MAX_SEQ_LENGTH, exclude=True)
 
     def __init__(
         self,
         service_id: str,
         ai_model_id: str = "ibm-granite/granite-embedding-125m-english",
         device: str = "cpu",
+        max_batch_size: int = GRANITE_MAX_BATCH_SIZE,
+        max_seq_length: int = GRANITE_MAX_SEQ_LENGTH,
     ):
         """Initialize the Granite embedding service with service_id and ai_model_id."""
         super().__init__(service_id=service_id, ai_model_id=ai_model_id)
         object.__setattr__(self, "device", device)
+        object.__setattr__(self, "max_batch_size", max_batch_size)
+        object.__setattr__(self, "max_seq_length", max_seq_length)
         object.__setattr__(self, "tokenizer", AutoTokenizer.from_pretrained(ai_model_id))
+        # Fast tokenizers reconfigure padding/truncation on every call and raise
+        # "Already borrowed" when used from two executor threads at once
+        object.__setattr__(self, "tokenizer_lock", threading.Lock())
         object.__setattr__(
             self, "model", AutoModel.from_pretrained(ai_model_id).to(self.device)
         )
 
     def generate_embedding(self, text: str) -> np.ndarray:
         """Generate a single text embedding as a NumPy array."""
-        tokens = self.tokenizer(
-            text, return_tensors="pt", padding=True, truncation=True
-        ).to(self.device)
-        with torch.no_grad():
-            output = self.model(**tokens)
-        return output.last_hidden_state.mean(dim=1).squeeze().cpu().numpy()
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts with batched forward passes.
+
+        Each chunk of up to `max_batch_size` texts is tokenized in one padded
+        call (serialized across threads; the forward pass is not) and mean-pooled over real tokens only (padding is masked out).
+        Returns a contiguous float32 array of shape (len(texts), hidden_size).
+        """
+        if not texts:
+            return np.empty((0, self.model.config.hidden_size), dtype=np.float32)
+
+        batches = []
+        for start in range(0, len(texts), self.max_batch_size):
+            with self.tokenizer_lock:
+                tokens = self.tokenizer(
+                    texts[start:start + self.max_batch_size],
+                    return_tensors="pt",
+                    padding=True,
+                    truncation=True,
+                    max_length=self.max_seq_length,
+                )
+            tokens = tokens.to(self.device)
+            with torch.no_grad():
+                output = self.model(**tokens)
+
+            # Mask-aware mean pooling
+            mask = tokens["attention_mask"].unsqueeze(-1).to(output.last_hidden_state.dtype)
+            summed = (output.last_hidden_state * mask).sum(dim=1)
+            counts = mask.sum(dim=1).clamp(min=1e-9)
+            batches.append((summed / counts).to(torch.float32).cpu().numpy())
+
+        return np.ascontiguousarray(np.concatenate(batches, axis=0), dtype=np.float32)
 
     async def generate_embeddings(
         self,
@@ -42,9 +82,9 @@ class GraniteEmbeddingService(EmbeddingGeneratorBase):
         settings: "PromptExecutionSettings | None" = None,
         **kwargs: Any,
     ) -> np.ndarray:
-        """Returns embeddings for the given texts as an ndarray (expected by Semantic Kernel)."""
-        embeddings = [self.generate_embedding(text) for text in texts]
-        return np.array(embeddings)
+        """Returns embeddings for the given texts as an ndarray (expected by Semantic Kernel).
+        Inference runs on the shared inference executor, off the event loop."""
+        return await inference_executor.run(self.embed_batch, list(texts), label="granite_embed")
 
     async def generate_raw_embeddings(
         self,
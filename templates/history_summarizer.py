@@ -0,0 +1,100 @@
+import asyncio
+
+from semantic_kernel.contents import AuthorRole
+from semantic_kernel.functions import KernelArguments
+
+import config
+
+
+def format_messages(messages) -> str:
+    """Render chat messages as plain 'User:' / 'Companio:' lines for the summary prompt."""
+    lines = []
+    for message in messages:
+        speaker = "User" if message.role == AuthorRole.USER else "Companio"
+        lines.append(f"{speaker}: {message.content}")
+    return "\n".join(lines)
+
+
+class HistorySummarizer:
+    """
+    Folds turns that fall out of a session's history window into a rolling summary.
+
+    After each turn, once a session holds batch_messages more than
+    target_count messages, the oldest ones are summarized together with the
+    existing summary by the kernel's ChatBot.Summarize function. This runs as
+    a background task between turns, so it never adds latency to a request;
+    the folded messages are only removed from the history once their summary
+    is ready. If summarization fails or falls behind, the session's truncation
+    reducer still caps the history (see SessionManager).
+    """
+
+    def __init__(
+        self,
+        target_count: int = config.CHAT_HISTORY_TARGET_COUNT,
+        batch_messages: int = config.HISTORY_SUMMARY_BATCH_MESSAGES,
+    ):
+        self.target_count = target_count
+        self.batch_messages = batch_messages
+        self._tasks = set()
+        self._stats = {"folds": 0, "messages_folded": 0, "failures": 0}
+
+    def schedule(self, kernel, session):
+        """Start summarizing the session's overflow in the background, if there is enough of it."""
+        if not config.HISTORY_SUMMARY_ENABLED:
+            return
+        if session.summary_task is not None and not session.summary_task.done():
+            return
+        if len(session.truncation_reducer.messages) < self.target_count + self.batch_messages:
+            return
+
+        task = asyncio.create_task(self._fold(kernel, session))
+        session.summary_task = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _fold_count(self, messages) -> int:
+        """Number of leading messages to fold, so the kept history starts on a user turn."""
+        fold_count = len(messages) - self.target_count
+        while fold_count < len(messages) and messages[fold_count].role != AuthorRole.USER:
+            fold_count += 1
+        return fold_count
+
+    async def _fold(self, kernel, session):
+        messages = session.truncation_reducer.messages
+        fold_count = self._fold_count(messages)
+        folded = list(messages[:fold_count])
+        if not folded:
+            return
+
+        try:
+            result = await kernel.invoke(
+                kernel.get_function("ChatBot", "Summarize"),
+                KernelArguments(summary=session.history_summary or "(none)", messages=format_messages(folded)),
+            )
+            summary = str(result).strip()
+        except Exception as e:
+            self._stats["failures"] += 1
+            print(f"History summarization failed for session {session.session_id}: {e}")
+            return
+
+        # Turns continue while the summary is generated; only drop the folded
+        # messages if they are still at the front of the history
+        messages = session.truncation_reducer.messages
+        if len(messages) < fold_count or any(a is not b for a, b in zip(messages[:fold_count], folded)):
+            return
+        del messages[:fold_count]
+        session.history_summary = summary
+        self._stats["folds"] += 1
+        self._stats["messages_folded"] += fold_count
+
+    async def stop(self):
+        """Cancel summaries still in progress (e.g. on shutdown)."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {**self._stats, "pending": len(self._tasks)}
+
+
+history_summarizer = HistorySummarizer()
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+
+class InferenceExecutor:
+    """
+    Dedicated thread pool for blocking model inference (embeddings, TTS).
+
+    Torch, ONNX Runtime and the Azure Speech SDK release the GIL while they
+    work, so running them here keeps the asyncio event loop free to serve
+    other requests. Tracks queue depth and per-label wait/run times.
+    """
+
+    def __init__(self, max_workers: int = config.INFERENCE_WORKERS, name: str = "inference"):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._max_queue_depth = 0
+        self._labels = {}
+
+    async def run(self, fn, *args, label: str | None = None, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and await its result."""
+        label = label or getattr(fn, "__name__", "task")
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queued)
+        dequeued = False
+
+        def dequeue():
+            # Called under the lock by whichever comes first: the worker
+            # starting the call or the awaiting coroutine giving up on it
+            nonlocal dequeued
+            if not dequeued:
+                dequeued = True
+                self._queued -= 1
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                dequeue()
+                self._running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._running -= 1
+                    self._record(label, started - submitted, finished - started)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, task)
+        finally:
+            # A call cancelled while still queued never reaches task()
+            with self._lock:
+                dequeue()
+
+    def _record(self, label: str, wait: float, run: float):
+        entry = self._labels.setdefault(
+            label, {"calls": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0, "total_run_ms": 0.0}
+        )
+        entry["calls"] += 1
+        entry["total_wait_ms"] += wait * 1000
+        entry["max_wait_ms"] = max(entry["max_wait_ms"], wait * 1000)
+        entry["total_run_ms"] += run * 1000
+
+    def stats(self) -> dict:
+        with self._lock:
+            labels = {
+                label: {
+                    "calls": entry["calls"],
+                    "avg_wait_ms": round(entry["total_wait_ms"] / entry["calls"], 2),
+                    "max_wait_ms": round(entry["max_wait_ms"], 2),
+                    "avg_run_ms": round(entry["total_run_ms"] / entry["calls"], 2),
+                }
+                for label, entry in self._labels.items()
+            }
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queue_depth,
+                "running": self._running,
+                "labels": labels,
+            }
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+inference_executor = InferenceExecutor()
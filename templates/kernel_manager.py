@@ -3,33 +3,20 @@ from semantic_kernel import Kernel
 from semantic_kernel.functions import KernelArguments
 from semantic_kernel.contents import ChatHistory
 from services import initialize_ai_service
-from config import SYSTEM_MESSAGE, USER_ID, USE_OLLAMA
+from config import SYSTEM_MESSAGE, USER_ID, USE_OLLAMA, HISTORY_SUMMARY_MAX_TOKENS
 from semantic_kernel.contents import AuthorRole
 from offline_memory import load_chat_history
 
-async def setup_kernel():
-    """Initialize the kernel and configure the AI service."""
-    kernel = Kernel()
-    service_id, model_name, kernel = await initialize_ai_service(kernel)
-    
-    # Set execution settings
-    settings = kernel.get_prompt_execution_settings_from_service_id(service_id)
-    settings.max_tokens = 256
-    settings.temperature = 0.7
-    settings.top_p = 0.8
-    settings.frequency_penalty = 0.5
-    settings.presence_penalty = 0.5
-
-    # Register chatbot function
-    chat_function = kernel.add_function(
-        plugin_name="ChatBot",
-        function_name="Chat",
-        prompt="""
+# Prompt for the ChatBot.Chat function (also measured by the context packer)
+CHAT_PROMPT_TEMPLATE = """
         <<INSTRUCTIONS>>
         This is a conversation between you, a kind AI companion, and a user.
         A description of who you are and how you should behave:
         {{ $system_message }}
 
+        Summary of the earlier conversation (if any):
+        {{ $history_summary }}
+
         Use the chat history to maintain context and provide relevant responses:
         {{ $truncation_reducer }}
         
@@ -48,11 +35,57 @@ async def setup_kernel():
         {{ $user_input }}
 
         **Your Response:**  
-        """,
+        """
+
+# Prompt for the ChatBot.Summarize function, which folds old turns into the session summary
+SUMMARY_PROMPT_TEMPLATE = """
+        Update the summary of a conversation between a user and their companion, Companio.
+        Keep names, people, places, preferences, feelings and anything the user asked to remember.
+        Leave out small talk. Write at most 5 short sentences in the third person.
+
+        Summary so far:
+        {{ $summary }}
+
+        New messages:
+        {{ $messages }}
+
+        Updated summary:
+        """
+
+async def setup_kernel():
+    """Initialize the kernel and configure the AI service."""
+    kernel = Kernel()
+    service_id, model_name, kernel = await initialize_ai_service(kernel)
+    
+    # Set execution settings
+    settings = kernel.get_prompt_execution_settings_from_service_id(service_id)
+    settings.max_tokens = 256
+    settings.temperature = 0.7
+    settings.top_p = 0.8
+    settings.frequency_penalty = 0.5
+    settings.presence_penalty = 0.5
+
+    # Register chatbot function
+    chat_function = kernel.add_function(
+        plugin_name="ChatBot",
+        function_name="Chat",
+        prompt=CHAT_PROMPT_TEMPLATE,
         template_format="semantic-kernel",
         prompt_execution_settings=settings,
     )
 
+    # Register history summarization function (runs in the background between turns)
+    summary_settings = kernel.get_prompt_execution_settings_from_service_id(service_id)
+    summary_settings.max_tokens = HISTORY_SUMMARY_MAX_TOKENS
+    summary_settings.temperature = 0.2
+    kernel.add_function(
+        plugin_name="ChatBot",
+        function_name="Summarize",
+        prompt=SUMMARY_PROMPT_TEMPLATE,
+        template_format="semantic-kernel",
+        prompt_execution_settings=summary_settings,
+    )
+
     # Initialize chat history
     # chat_history = ChatHistory(system_message=SYSTEM_MESSAGE)
 
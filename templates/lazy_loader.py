@@ -0,0 +1,89 @@
+import importlib
+import sys
+import threading
+import time
+
+# Milliseconds spent importing modules / loading models, by name, for the import profile report
+_import_profile = {}
+
+
+def record_import(name: str, seconds: float):
+    """Record how long an import or model load took."""
+    _import_profile[name] = round(seconds * 1000, 1)
+
+
+def import_profile() -> dict:
+    """Import and load times in ms, slowest first."""
+    return dict(sorted(_import_profile.items(), key=lambda item: item[1], reverse=True))
+
+
+def timed_import(name: str):
+    """Import a module, recording how long it took if it wasn't already loaded."""
+    if name in sys.modules:
+        return sys.modules[name]
+    start_time = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed = time.perf_counter() - start_time
+    record_import(name, elapsed)
+    print(f"Imported {name} in {elapsed:.2f}s")
+    return module
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported on first attribute access.
+
+    Used for heavy optional stacks (Coqui TTS, Vosk, Azure Speech) so that
+    import time and resident memory only include what the active config uses.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None or self._name in sys.modules
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = timed_import(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+class LazyModel:
+    """
+    Stand-in for a model that is only loaded on first use.
+
+    Attribute access is forwarded to the real model, loading it (once, thread
+    safe) the first time. Model calls normally run on the inference executor,
+    so the load happens there rather than on the event loop.
+    """
+
+    def __init__(self, name: str, factory):
+        self._name = name
+        self._factory = factory
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    start_time = time.perf_counter()
+                    self._model = self._factory()
+                    elapsed = time.perf_counter() - start_time
+                    record_import(self._name, elapsed)
+                    print(f"Loaded deferred component {self._name} in {elapsed:.2f}s")
+        return self._model
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
@@ -0,0 +1,179 @@
+"""
+Bulk memory ingestion.
+
+Loads many memories at once (e.g. an existing chat_history.json or exported
+care notes) and writes them in batches: each batch is embedded together by
+the dense, BM25 and ColBERT models and upserted with one request, with
+several batches in flight so embedding and upload overlap.
+
+Usage:
+    python memory_ingestion.py notes.jsonl [--user-id 123] [--batch-size 64] [--concurrency 2] [--start-qdrant]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from semantic_kernel import Kernel
+
+import config
+from azure_search_manager import store_memories
+from memory_writer import categorize_input
+from qdrant_search_manager import build_memory_points
+
+
+def memory_from_record(record: dict, user_id: str):
+    """Turn an exported record into a (user_id, memory_text, category, timestamp) tuple."""
+    memory_text = (record.get("memory_text") or record.get("text") or record.get("content") or "").strip()
+    if not memory_text:
+        return None
+    category = record.get("category") or categorize_input(memory_text)
+    return (str(record.get("user_id") or user_id), memory_text, category, record.get("timestamp"))
+
+
+def load_memories(path: str, user_id: str = config.USER_ID) -> list:
+    """
+    Read memories to ingest from a file.
+
+    Supported formats:
+      - chat_history.json ({user_id: [{"role": ..., "content": ...}]}): the
+        user's messages, skipping questions just like live chat does
+      - a JSON list or JSON Lines (.jsonl) of records with "memory_text" (or
+        "text"), and optionally "category", "user_id" and "timestamp"
+      - plain text, one memory per line
+
+    Returns (user_id, memory_text, category, timestamp) tuples, without duplicates.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            data = [json.loads(line) for line in f if line.strip()]
+        elif path.endswith(".json"):
+            data = json.load(f)
+        else:
+            data = [{"memory_text": line} for line in f]
+
+    memories = []
+    if isinstance(data, dict):
+        # offline_memory chat history: {user_id: [{"role", "content"}]}
+        for history_user_id, messages in data.items():
+            for message in messages:
+                if message.get("role") != "user":
+                    continue
+                memory = memory_from_record({"memory_text": message.get("content")}, history_user_id)
+                if memory is not None and memory[2] != "question":
+                    memories.append(memory)
+    else:
+        for record in data:
+            if isinstance(record, str):
+                record = {"memory_text": record}
+            memory = memory_from_record(record, user_id)
+            if memory is not None:
+                memories.append(memory)
+
+    seen = set()
+    unique_memories = []
+    for memory in memories:
+        if (memory[0], memory[1]) not in seen:
+            seen.add((memory[0], memory[1]))
+            unique_memories.append(memory)
+    return unique_memories
+
+
+def print_progress(completed: int, total: int, elapsed: float):
+    rate = completed / elapsed if elapsed else 0.0
+    print(f"Ingested {completed}/{total} memories ({rate:.1f}/s)", flush=True)
+
+
+async def _write_batch(kernel: Kernel, batch: list):
+    if "qdrant_client" in kernel.services:
+        points = await build_memory_points(kernel, batch)
+        # upsert is a coroutine on the async client (upload_points is a plain blocking
+        # method there, returning None) and takes gRPC-built points as they are
+        await kernel.services["qdrant_client"].upsert(config.QDRANT_COLLECTION, points=points, wait=False)
+    elif "collection" in kernel.services:
+        await store_memories(kernel, batch)
+    else:
+        raise RuntimeError("No memory store is available")
+
+
+async def ingest_memories(
+    kernel: Kernel,
+    memories: list,
+    batch_size: int = config.INGEST_BATCH_SIZE,
+    concurrency: int = config.INGEST_CONCURRENCY,
+    progress=print_progress,
+) -> dict:
+    """
+    Write many (user_id, memory_text, category[, timestamp]) memories in batches.
+
+    Up to `concurrency` batches are processed at once, so one batch uploads
+    while the next is being embedded (model calls share the inference
+    executor). Failed batches are counted and skipped rather than aborting
+    the whole ingestion. progress(completed, total, elapsed) is called after
+    every batch.
+    """
+    start_time = time.perf_counter()
+    batches = [memories[i:i + batch_size] for i in range(0, len(memories), batch_size)]
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    counts = {"written": 0, "failed": 0}
+
+    async def ingest_batch(batch):
+        async with semaphore:
+            try:
+                await _write_batch(kernel, batch)
+                counts["written"] += len(batch)
+            except Exception as e:
+                counts["failed"] += len(batch)
+                print(f"Failed to ingest a batch of {len(batch)} memories: {e}")
+            if progress is not None:
+                progress(counts["written"] + counts["failed"], len(memories), time.perf_counter() - start_time)
+
+    await asyncio.gather(*(ingest_batch(batch) for batch in batches))
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "memories": len(memories),
+        "written": counts["written"],
+        "failed": counts["failed"],
+        "batches": len(batches),
+        "seconds": round(elapsed, 2),
+        "per_second": round(counts["written"] / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def _main(args):
+    from kernel_manager import setup_kernel
+    from qdrant_manager import QdrantManager
+
+    qdrant_manager = None
+    if args.start_qdrant and config.USE_OLLAMA:
+        qdrant_manager = QdrantManager()
+        if not qdrant_manager.start_server():
+            print("Warning: Failed to start Qdrant server.")
+
+    try:
+        memories = load_memories(args.path, user_id=args.user_id)
+        print(f"Loaded {len(memories)} memories from {args.path}")
+        if not memories:
+            return
+
+        kernel, _, _ = await setup_kernel()
+        stats = await ingest_memories(kernel, memories, batch_size=args.batch_size, concurrency=args.concurrency)
+        print(f"Ingestion finished: {stats}")
+    finally:
+        if qdrant_manager is not None:
+            qdrant_manager.stop_server()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load memories into the Companio memory store.")
+    parser.add_argument("path", help="chat_history.json, a JSON / JSON Lines export, or a text file with one memory per line")
+    parser.add_argument("--user-id", default=config.USER_ID, help="User id for records that don't specify one")
+    parser.add_argument("--batch-size", type=int, default=config.INGEST_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=config.INGEST_CONCURRENCY)
+    parser.add_argument("--start-qdrant", action="store_true", help="Start the bundled Qdrant server (when the app isn't running)")
+    args = parser.parse_args()
+    if not os.path.exists(args.path):
+        parser.error(f"File not found: {args.path}")
+    asyncio.run(_main(args))
@@ -0,0 +1,64 @@
+from config import MEMORY_SEARCH_TOP_K, MEMORY_SCORE_RELATIVE_CUTOFF, MEMORY_TOKEN_BUDGET
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def select_memories(
+    scored_memories,
+    threshold: float | None = None,
+    relative_cutoff: float | None = MEMORY_SCORE_RELATIVE_CUTOFF,
+    top_k: int = MEMORY_SEARCH_TOP_K,
+):
+    """
+    Filter (memory_text, score) pairs down to the relevant ones.
+
+    Pairs are ranked by score and duplicates dropped. A pair is kept only if
+    its score reaches the absolute threshold (when given) and is within
+    relative_cutoff of the best score, so the number of memories adapts to
+    how strong the recall is, up to top_k.
+    """
+    ranked = sorted(scored_memories, key=lambda pair: pair[1], reverse=True)
+    if not ranked:
+        return []
+
+    best_score = ranked[0][1]
+    selected = []
+    seen = set()
+    for memory_text, score in ranked:
+        if len(selected) >= top_k:
+            break
+        if not memory_text or memory_text in seen:
+            continue
+        if threshold is not None and score < threshold:
+            break
+        if relative_cutoff and best_score > 0 and score < best_score * relative_cutoff:
+            break
+        seen.add(memory_text)
+        selected.append((memory_text, score))
+    return selected
+
+
+def format_past_memory(memories, token_budget: int = MEMORY_TOKEN_BUDGET, count_tokens=estimate_tokens) -> tuple:
+    """
+    Build the past-memory prompt block from ranked memory texts.
+
+    Memories are added best first until the token budget is used up.
+    count_tokens measures text (the context packer passes the model's tokenizer).
+    Returns (block, number of memories included, tokens).
+    """
+    header = "\n\n[Past Memories that MAY be useful]:\n"
+    included = []
+    used_tokens = count_tokens(header)
+    for memory_text in memories:
+        memory_tokens = count_tokens(memory_text) + 1
+        if token_budget and used_tokens + memory_tokens > token_budget:
+            continue
+        included.append(memory_text)
+        used_tokens += memory_tokens
+
+    if not included:
+        return "", 0, 0
+    return header + "\n".join(included) + "\n", len(included), used_tokens
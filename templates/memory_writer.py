@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+from semantic_kernel import Kernel
+
+import config
+from azure_search_manager import store_memories
+from qdrant_search_manager import store_memories_local
+
+
+async def write_memories(kernel: Kernel, memories: list):
+    """Persist (user_id, memory_text, category) memories to whichever store the kernel uses."""
+    if "collection" in kernel.services:
+        await store_memories(kernel, memories)
+    elif "qdrant_client" in kernel.services:
+        await store_memories_local(kernel, memories)
+
+
+def categorize_input(user_input):
+    """Classify the type of input dynamically."""
+    user_input_lower = user_input.lower()
+
+    # If it contains a question mark, assume it's a question
+    if "?" in user_input_lower:
+        return "question"
+
+    # If it mentions preferences, assume it's a preference
+    if any(word in user_input_lower for word in ["like", "love", "enjoy", "favorite", "prefer"]):
+        return "preference"
+
+    # Otherwise, treat it as a general conversation
+    return "chat_interaction"
+
+
+class MemoryWriteQueue:
+    """
+    Background write-behind queue for memory persistence.
+
+    Memories are queued during a conversation turn and written by a worker
+    task in batches, so the response never waits for embedding + upsert.
+    Failed batches are retried with exponential backoff; if the queue is full
+    the new memory is dropped (and counted) rather than blocking the request.
+    """
+
+    def __init__(
+        self,
+        max_size: int = config.MEMORY_WRITE_QUEUE_SIZE,
+        batch_size: int = config.MEMORY_WRITE_BATCH_SIZE,
+        max_retries: int = config.MEMORY_WRITE_MAX_RETRIES,
+        retry_delay: float = config.MEMORY_WRITE_RETRY_DELAY,
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue = None
+        self._worker = None
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "retries": 0, "batches": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self):
+        """Start the background worker on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, kernel: Kernel, user_id: str, memory_text: str, category: str):
+        """Queue a memory for writing, or write it immediately if the worker is not running."""
+        if not self.running:
+            await write_memories(kernel, [(user_id, memory_text, category)])
+            return
+
+        try:
+            self._queue.put_nowait((kernel, (user_id, memory_text, category)))
+            self._stats["enqueued"] += 1
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            print(f"Memory write queue full ({self.max_size}), dropping memory")
+
+    async def flush(self, timeout: float | None = None):
+        """Wait until every queued memory has been written (or given up on)."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"Timed out flushing memory writes, {self._queue.qsize()} still pending")
+
+    async def stop(self, timeout: float | None = config.MEMORY_WRITE_FLUSH_TIMEOUT):
+        """Flush pending writes, then stop the worker. Call on server shutdown."""
+        if not self.running:
+            return
+        await self.flush(timeout=timeout)
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def stats(self) -> dict:
+        return {**self._stats, "pending": self._queue.qsize() if self._queue else 0}
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_batch(self, batch: list):
+        # Group by kernel so a config change mid-queue writes to the right store
+        groups = {}
+        for kernel, memory in batch:
+            groups.setdefault(id(kernel), (kernel, []))[1].append(memory)
+
+        for kernel, memories in groups.values():
+            for attempt in range(self.max_retries + 1):
+                try:
+                    start_time = time.perf_counter()
+                    await write_memories(kernel, memories)
+                    self._stats["written"] += len(memories)
+                    self._stats["batches"] += 1
+                    print(f"Stored {len(memories)} memories in {(time.perf_counter() - start_time) * 1000:.0f} ms")
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        self._stats["failed"] += len(memories)
+                        print(f"Giving up on {len(memories)} memories after {attempt + 1} attempts: {e}")
+                        break
+                    self._stats["retries"] += 1
+                    await asyncio.sleep(self.retry_delay * (2 ** attempt))
+
+
+memory_write_queue = MemoryWriteQueue()
@@ -0,0 +1,78 @@
+import numpy as np
+
+import config
+
+
+def pool_multivector(
+    vectors,
+    pool_factor: int | None = None,
+    max_vectors: int | None = None,
+    protected_tokens: int = 1,
+) -> np.ndarray:
+    """
+    Compress a ColBERT multivector by clustering similar token vectors together.
+
+    Token vectors are merged with agglomerative clustering (cosine similarity
+    between cluster centroids) until len / pool_factor vectors remain, capped
+    at max_vectors; each cluster is stored as its normalized mean. The first
+    protected_tokens vectors (the [CLS] token) are kept as they are, as long
+    as the cap leaves room for at least one cluster. MaxSim scoring works
+    unchanged on the pooled vectors, with storage and rerank cost reduced by
+    roughly the pool factor.
+
+    pool_factor and max_vectors default to COLBERT_POOL_FACTOR and
+    COLBERT_MAX_VECTORS; pass max_vectors=0 for no cap.
+    """
+    if pool_factor is None:
+        pool_factor = config.COLBERT_POOL_FACTOR
+    if max_vectors is None:
+        max_vectors = config.COLBERT_MAX_VECTORS
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    target = len(vectors)
+    if pool_factor and pool_factor > 1:
+        target = max(len(vectors) // pool_factor, 1)
+    if max_vectors:
+        target = min(target, max_vectors)
+    if target >= len(vectors):
+        return vectors
+
+    protected_tokens = min(protected_tokens, target - 1)
+    protected, tokens = vectors[:protected_tokens], vectors[protected_tokens:]
+    clusters = _cluster_tokens(tokens, target - protected_tokens)
+    return np.ascontiguousarray(np.concatenate([protected, clusters]))
+
+
+def _cluster_tokens(tokens: np.ndarray, n_clusters: int) -> np.ndarray:
+    """Merge the most similar pair of clusters until n_clusters remain; returns normalized centroids."""
+    sums = tokens.astype(np.float32).copy()
+    counts = np.ones(len(tokens), dtype=np.float32)
+    active = np.ones(len(tokens), dtype=bool)
+
+    centroids = _normalize(sums)
+    similarity = centroids @ centroids.T
+    np.fill_diagonal(similarity, -np.inf)
+
+    for _ in range(len(tokens) - n_clusters):
+        i, j = np.unravel_index(np.argmax(similarity), similarity.shape)
+        # Fold cluster j into cluster i
+        sums[i] += sums[j]
+        counts[i] += counts[j]
+        active[j] = False
+        similarity[j, :] = -np.inf
+        similarity[:, j] = -np.inf
+
+        centroid = sums[i] / max(np.linalg.norm(sums[i]), 1e-12)  # Opposite vectors can cancel out
+        centroids[i] = centroid
+        row = centroids @ centroid
+        row[~active] = -np.inf
+        row[i] = -np.inf
+        similarity[i, :] = row
+        similarity[:, i] = row
+
+    return _normalize(sums[active] / counts[active, None])
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
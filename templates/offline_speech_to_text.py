@@ -1,11 +1,12 @@
 import os
 import json
-import sounddevice as sd
 import queue
-import vosk
+import threading
+import time
 import zipfile
 import requests
 import shutil
+from lazy_loader import record_import
 
 # Define paths
 VOSK_MODEL_DIR = "models/vosk-en"
@@ -41,13 +42,24 @@ def download_and_extract_vosk_model():
     # Remove the ZIP file after extraction
     os.remove(VOSK_MODEL_ZIP_PATH)
 
-# Ensure the Vosk model is available
-download_and_extract_vosk_model()
-
-# Initialize Vosk STT Model
-model = vosk.Model(VOSK_MODEL_PATH)
+# The Vosk model is downloaded (if needed) and loaded on first use, not at import
+model = None
+_model_lock = threading.Lock()
 q = queue.Queue()
 
+def get_model():
+    """Ensure the Vosk model is available, load it once and return it."""
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                start_time = time.perf_counter()
+                import vosk
+                download_and_extract_vosk_model()
+                model = vosk.Model(VOSK_MODEL_PATH)
+                record_import("vosk_model", time.perf_counter() - start_time)
+    return model
+
 def callback(indata, frames, time, status):
     """Callback function to store recorded audio chunks."""
     if status:
@@ -57,11 +69,15 @@ def callback(indata, frames, time, status):
 def offline_speech_to_text():
     """Converts speech to text using Vosk (Offline)."""
     
+    import sounddevice as sd
+    import vosk
+
+    stt_model = get_model()
     print("🎤 Speak now... (Say 'stop listening' to finish speaking or 'exit program' to quit the program entirely.)")
     
     with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype="int16",
                            channels=1, callback=callback):
-        recognizer = vosk.KaldiRecognizer(model, 16000)
+        recognizer = vosk.KaldiRecognizer(stt_model, 16000)
         final_text = []
         stop_recognition = False
         exit_program = False
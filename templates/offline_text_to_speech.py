@@ -1,22 +1,35 @@
-import os
-import sounddevice as sd
-import torch
-import torchaudio
+import numpy as np
 import logging
-from TTS.api import TTS
-import io
+import threading
+import time
+from audio_utils import encode_audio, pcm16_from_float
+from config import COQUI_TTS_MODEL, COQUI_TTS_VOICES
+from lazy_loader import record_import
 
 # Reduce logging noise
 logging.getLogger("TTS").setLevel(logging.ERROR)
 
-# Load a multi-speaker, multi-lingual TTS model
-tts_model = TTS("tts_models/en/vctk/vits", progress_bar=False).to("cpu")
+# The multi-speaker TTS model is loaded on first use, not at import
+tts_model = None
+_tts_model_lock = threading.Lock()
+
+def get_tts_model():
+    """Load the multi-speaker, multi-lingual Coqui TTS model once and return it."""
+    global tts_model
+    if tts_model is None:
+        with _tts_model_lock:
+            if tts_model is None:
+                start_time = time.perf_counter()
+                from TTS.api import TTS
+                tts_model = TTS(COQUI_TTS_MODEL, progress_bar=False).to("cpu")
+                record_import("coqui_tts_model", time.perf_counter() - start_time)
+    return tts_model
+
+# Output sample rate of the VITS model
+SAMPLE_RATE = 22050
 
 # Speaker ID mapping for gender (update based on model's available speakers)
-voice_mapping = {
-    "male": "p229",
-    "female": "p240"
-}
+voice_mapping = COQUI_TTS_VOICES
 
 def speak_text(text, gender="male"):
     """
@@ -33,21 +46,13 @@ def speak_text(text, gender="male"):
     speaker = voice_mapping.get(gender, "p240")  # Default to female
 
     # Generate speech (returns NumPy array)
-    audio_data = tts_model.tts(text=text, speaker=speaker)
-
-    # Convert to tensor and play with torchaudio
-    sample_rate = 22050
-    audio_tensor = torch.tensor(audio_data).unsqueeze(0)  # Add batch dimension
-    torchaudio.save("temp_audio.wav", audio_tensor, sample_rate)
+    audio_data = get_tts_model().tts(text=text, speaker=speaker)
 
-    # Load and play using sounddevice
-    waveform, sr = torchaudio.load("temp_audio.wav")
-    sd.play(waveform.numpy().T, sr)
+    # Play straight from memory with sounddevice
+    import sounddevice as sd
+    sd.play(np.asarray(audio_data, dtype=np.float32), SAMPLE_RATE)
     sd.wait()
 
-    # Clean up temp file
-    os.remove("temp_audio.wav")
-
 def speak_text_to_bytes(text, gender="male"):
     """
     Convert text to speech and return audio bytes.
@@ -62,17 +67,29 @@ def speak_text_to_bytes(text, gender="male"):
     if not text.strip():
         return bytes()
 
+    pcm, sample_rate = synthesize_pcm(text, gender=gender)
+
+    # Encode to WAV in memory
+    return encode_audio(pcm, sample_rate, "wav")
+
+def synthesize_pcm(text, gender="male"):
+    """
+    Convert text to speech and return raw audio.
+
+    Args:
+        text (str): The text to synthesize.
+        gender (str): The voice gender ('male' or 'female').
+
+    Returns:
+        tuple: (16-bit mono PCM bytes, sample rate).
+    """
+    if not text.strip():
+        return bytes(), SAMPLE_RATE
+
     # Select speaker ID based on gender
     speaker = voice_mapping.get(gender, "p240")  # Default to female
 
     # Generate speech (returns NumPy array)
-    audio_data = tts_model.tts(text=text, speaker=speaker)
-
-    # Convert to bytes in WAV format
-    buffer = io.BytesIO()
-    sample_rate = 22050
-    audio_tensor = torch.tensor(audio_data).unsqueeze(0)
-    torchaudio.save(buffer, audio_tensor, sample_rate, format="wav")
-    buffer.seek(0)
-    
-    return buffer.read()
+    audio_data = get_tts_model().tts(text=text, speaker=speaker)
+
+    return pcm16_from_float(audio_data), SAMPLE_RATE
@@ -0,0 +1,226 @@
+"""
+Qdrant collection layout: creation, tuning profiles and migration.
+
+The storage/index settings of the memory collection come from a named
+profile in config.QDRANT_COLLECTION_PROFILES. New collections are created
+with it. Existing collections are only migrated on request, in place with
+update_collection (only the settings that differ are changed, so this is a
+no-op once applied). Changing quantization or on-disk storage rebuilds the
+collection's segments, which can take a while on large stores.
+
+Usage (migrate the collection of a running Qdrant server):
+    python qdrant_collection.py [--profile low_memory]
+"""
+import argparse
+import asyncio
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import Distance, VectorParams, models
+
+import config
+from qdrant_connection import create_qdrant_client
+
+# Settings a profile can override; None leaves the Qdrant default
+PROFILE_DEFAULTS = {
+    "dense_quantization": None,  # None, "scalar" (int8) or "binary" (1 bit)
+    "dense_on_disk": False,  # Keep original dense vectors on disk (quantized copies stay in RAM)
+    "late_interaction_on_disk": False,  # Keep ColBERT multivectors on disk
+    "late_interaction_hnsw": True,  # False skips the HNSW graph; multivectors are only used to rerank
+    "sparse_on_disk": False,  # Keep the BM25 sparse index on disk
+    "on_disk_payload": None,
+    "hnsw_m": None,
+    "hnsw_ef_construct": None,
+}
+
+
+def collection_profile(name: str | None = None) -> dict:
+    """Settings of the named (or configured) collection profile, with defaults filled in."""
+    name = name or config.QDRANT_COLLECTION_PROFILE
+    if name not in config.QDRANT_COLLECTION_PROFILES:
+        raise ValueError(f"Unknown Qdrant collection profile: {name}")
+    return {**PROFILE_DEFAULTS, **config.QDRANT_COLLECTION_PROFILES[name]}
+
+
+def _quantization(kind: str | None):
+    if kind == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if kind == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def _quantization_kind(quantization_config) -> str | None:
+    if isinstance(quantization_config, models.ScalarQuantization):
+        return "scalar"
+    if isinstance(quantization_config, models.BinaryQuantization):
+        return "binary"
+    return None
+
+
+def _collection_hnsw(profile: dict):
+    if profile["hnsw_m"] is None and profile["hnsw_ef_construct"] is None:
+        return None
+    return models.HnswConfigDiff(m=profile["hnsw_m"], ef_construct=profile["hnsw_ef_construct"])
+
+
+def dense_search_params(profile: dict | None = None):
+    """Search params for the dense prefetch: rescore quantized candidates with the original vectors."""
+    profile = profile or collection_profile()
+    if profile["dense_quantization"] is None:
+        return None
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(
+            rescore=True, oversampling=config.QDRANT_QUANTIZATION_OVERSAMPLING
+        )
+    )
+
+
+async def create_collection(qdrant_client: AsyncQdrantClient, profile: dict, collection_name: str | None = None):
+    """Create the memory collection (or another with the same layout) with the profile's storage and index settings."""
+    await qdrant_client.create_collection(
+        collection_name=collection_name or config.QDRANT_COLLECTION,
+        vectors_config={
+            "dense_embedding": VectorParams(
+                size=config.DENSE_VECTOR_SIZE,
+                distance=Distance.COSINE,
+                on_disk=profile["dense_on_disk"],
+                quantization_config=_quantization(profile["dense_quantization"]),
+            ),
+            "late_interaction_embedding": VectorParams(
+                size=config.LATE_INTERACTION_VECTOR_SIZE,
+                distance=Distance.COSINE,
+                multivector_config=models.MultiVectorConfig(
+                    comparator=models.MultiVectorComparator.MAX_SIM,
+                ),
+                on_disk=profile["late_interaction_on_disk"],
+                hnsw_config=None if profile["late_interaction_hnsw"] else models.HnswConfigDiff(m=0),
+            ),
+        },
+        sparse_vectors_config={
+            "bm25_embedding": models.SparseVectorParams(
+                modifier=models.Modifier.IDF,
+                index=models.SparseIndexParams(on_disk=profile["sparse_on_disk"]),
+            )
+        },
+        hnsw_config=_collection_hnsw(profile),
+        on_disk_payload=profile["on_disk_payload"],
+    )
+
+
+async def migrate_collection(qdrant_client: AsyncQdrantClient, profile: dict) -> list:
+    """
+    Bring an existing collection in line with the profile.
+
+    Compares the live collection config with the profile and sends one
+    update_collection with only the differences (Qdrant then rebuilds the
+    affected segments in the background). Returns the changed settings.
+    """
+    info = await qdrant_client.get_collection(config.QDRANT_COLLECTION)
+    params = info.config.params
+    changes = []
+    vector_diffs = {}
+
+    dense = params.vectors["dense_embedding"]
+    dense_diff = {}
+    if bool(dense.on_disk) != profile["dense_on_disk"]:
+        dense_diff["on_disk"] = profile["dense_on_disk"]
+    if _quantization_kind(dense.quantization_config) != profile["dense_quantization"]:
+        dense_diff["quantization_config"] = _quantization(profile["dense_quantization"]) or models.Disabled.DISABLED
+    if dense_diff:
+        vector_diffs["dense_embedding"] = models.VectorParamsDiff(**dense_diff)
+        changes.extend(f"dense_embedding.{key}" for key in dense_diff)
+
+    late = params.vectors["late_interaction_embedding"]
+    late_diff = {}
+    if bool(late.on_disk) != profile["late_interaction_on_disk"]:
+        late_diff["on_disk"] = profile["late_interaction_on_disk"]
+    late_hnsw_disabled = late.hnsw_config is not None and late.hnsw_config.m == 0
+    if late_hnsw_disabled == profile["late_interaction_hnsw"]:
+        late_diff["hnsw_config"] = models.HnswConfigDiff(
+            m=(profile["hnsw_m"] or info.config.hnsw_config.m) if profile["late_interaction_hnsw"] else 0
+        )
+    if late_diff:
+        vector_diffs["late_interaction_embedding"] = models.VectorParamsDiff(**late_diff)
+        changes.extend(f"late_interaction_embedding.{key}" for key in late_diff)
+
+    sparse_config = None
+    sparse = (params.sparse_vectors or {}).get("bm25_embedding")
+    sparse_on_disk = bool(sparse and sparse.index and sparse.index.on_disk)
+    if sparse is not None and sparse_on_disk != profile["sparse_on_disk"]:
+        sparse_config = {
+            "bm25_embedding": models.SparseVectorParams(
+                modifier=models.Modifier.IDF,
+                index=models.SparseIndexParams(on_disk=profile["sparse_on_disk"]),
+            )
+        }
+        changes.append("bm25_embedding.on_disk")
+
+    hnsw_diff = {}
+    if profile["hnsw_m"] is not None and info.config.hnsw_config.m != profile["hnsw_m"]:
+        hnsw_diff["m"] = profile["hnsw_m"]
+    if profile["hnsw_ef_construct"] is not None and info.config.hnsw_config.ef_construct != profile["hnsw_ef_construct"]:
+        hnsw_diff["ef_construct"] = profile["hnsw_ef_construct"]
+    changes.extend(f"hnsw.{key}" for key in hnsw_diff)
+
+    collection_params = None
+    if profile["on_disk_payload"] is not None and params.on_disk_payload != profile["on_disk_payload"]:
+        collection_params = models.CollectionParamsDiff(on_disk_payload=profile["on_disk_payload"])
+        changes.append("on_disk_payload")
+
+    if changes:
+        await qdrant_client.update_collection(
+            collection_name=config.QDRANT_COLLECTION,
+            vectors_config=vector_diffs or None,
+            sparse_vectors_config=sparse_config,
+            hnsw_config=models.HnswConfigDiff(**hnsw_diff) if hnsw_diff else None,
+            collection_params=collection_params,
+        )
+    return changes
+
+
+async def ensure_payload_indexes(qdrant_client: AsyncQdrantClient, payload_schema: dict | None = None):
+    """Create the configured payload indexes (e.g. on category and timestamp) that don't exist yet."""
+    if payload_schema is None:
+        payload_schema = (await qdrant_client.get_collection(config.QDRANT_COLLECTION)).payload_schema
+    for field_name, field_schema in config.QDRANT_PAYLOAD_INDEXES.items():
+        if field_name not in payload_schema:
+            await qdrant_client.create_payload_index(
+                config.QDRANT_COLLECTION, field_name=field_name, field_schema=models.PayloadSchemaType(field_schema)
+            )
+
+
+async def ensure_collection(qdrant_client: AsyncQdrantClient, profile_name: str | None = None):
+    """Create the memory collection if needed, or migrate it to the profile when QDRANT_MIGRATE_COLLECTION is on."""
+    profile = collection_profile(profile_name)
+    collections_response = await qdrant_client.get_collections()
+    existing_collections = [c.name for c in collections_response.collections]
+
+    if config.QDRANT_COLLECTION not in existing_collections:
+        await create_collection(qdrant_client, profile)
+        print(f"Created Qdrant collection {config.QDRANT_COLLECTION} with profile {profile_name or config.QDRANT_COLLECTION_PROFILE}")
+    elif config.QDRANT_MODE == "server" and (config.QDRANT_MIGRATE_COLLECTION or profile_name):
+        changes = await migrate_collection(qdrant_client, profile)
+        if changes:
+            print(f"Migrated Qdrant collection {config.QDRANT_COLLECTION}: {', '.join(changes)}")
+
+    # Embedded mode keeps everything in memory and ignores storage and index settings
+    if config.QDRANT_MODE == "server":
+        await ensure_payload_indexes(qdrant_client)
+
+
+async def _main(args):
+    qdrant_client = create_qdrant_client()
+    try:
+        await ensure_collection(qdrant_client, args.profile)
+        info = await qdrant_client.get_collection(config.QDRANT_COLLECTION)
+        print(f"Collection status: {info.status}, points: {info.points_count}, segments: {info.segments_count}")
+    finally:
+        await qdrant_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or migrate the Companio memory collection.")
+    parser.add_argument("--profile", default=config.QDRANT_COLLECTION_PROFILE, choices=list(config.QDRANT_COLLECTION_PROFILES))
+    asyncio.run(_main(parser.parse_args()))
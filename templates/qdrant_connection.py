@@ -0,0 +1,81 @@
+import socket
+from urllib.parse import urlparse
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+import config
+
+
+def embedded_path() -> str:
+    """Storage directory for embedded mode (QDRANT_EMBEDDED_PATH, or next to the server's data)."""
+    if config.QDRANT_EMBEDDED_PATH:
+        return config.QDRANT_EMBEDDED_PATH
+    from qdrant_manager import QdrantManager  # Only for its platform-specific paths
+    return QdrantManager().embedded_dir
+
+
+def grpc_port_reachable() -> bool:
+    """Whether the Qdrant server accepts connections on QDRANT_GRPC_PORT."""
+    host = urlparse(config.QDRANT_HOST).hostname or config.QDRANT_HOST
+    try:
+        with socket.create_connection((host, config.QDRANT_GRPC_PORT), timeout=config.QDRANT_GRPC_PROBE_TIMEOUT):
+            return True
+    except OSError:
+        return False
+
+
+def client_options(transport: str | None = None, mode: str | None = None, path: str | None = None) -> dict:
+    """
+    Connection settings for a Qdrant client in the given (or configured) mode and transport.
+
+    "embedded" runs qdrant-client's local mode in this process on `path`:
+    no server to start, but every collection is held in memory and searched
+    by brute force, so it suits small single-user stores.
+
+    For a server, "grpc" keeps one HTTP/2 channel with keepalive pings, so
+    an idle desktop session doesn't pay for reconnecting on the next
+    message; "rest" uses the HTTP API. Both use QDRANT_TIMEOUT for requests.
+    When the transport comes from config and the server doesn't listen on
+    the gRPC port (e.g. an existing server started without it), REST is used.
+    """
+    mode = mode or config.QDRANT_MODE
+    if mode == "embedded":
+        return {"path": path or embedded_path()}
+    if mode != "server":
+        raise ValueError(f"Unknown Qdrant mode: {mode}")
+
+    configured = transport is None
+    transport = transport or config.QDRANT_TRANSPORT
+    if transport not in ("grpc", "rest"):
+        raise ValueError(f"Unknown Qdrant transport: {transport}")
+    if transport == "grpc" and configured and not grpc_port_reachable():
+        print(f"Qdrant gRPC port {config.QDRANT_GRPC_PORT} is not reachable, using REST on port {config.QDRANT_PORT}")
+        transport = "rest"
+
+    options = {
+        "url": config.QDRANT_HOST,
+        "port": config.QDRANT_PORT,
+        "timeout": config.QDRANT_TIMEOUT,
+    }
+    if transport == "grpc":
+        options.update(
+            grpc_port=config.QDRANT_GRPC_PORT,
+            prefer_grpc=True,
+            grpc_options={
+                "grpc.keepalive_time_ms": config.QDRANT_GRPC_KEEPALIVE_MS,
+                "grpc.keepalive_timeout_ms": config.QDRANT_GRPC_KEEPALIVE_TIMEOUT_MS,
+                "grpc.keepalive_permit_without_calls": 1,
+                "grpc.http2.max_pings_without_data": 0,
+            },
+        )
+    return options
+
+
+def create_qdrant_client(transport: str | None = None, mode: str | None = None, path: str | None = None) -> AsyncQdrantClient:
+    """Async client for the app. services keeps one per process and reuses it across kernel rebuilds."""
+    return AsyncQdrantClient(**client_options(transport, mode, path))
+
+
+def create_sync_qdrant_client(transport: str | None = None, mode: str | None = None, path: str | None = None) -> QdrantClient:
+    """Blocking client with the same settings, for command line tools and benchmarks."""
+    return QdrantClient(**client_options(transport, mode, path))
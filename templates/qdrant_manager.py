@@ -5,9 +5,13 @@ import time
 import platform
 import signal
 import shutil
+import urllib.error
+import urllib.request
 import appdirs
 import logging
 
+import config
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -97,6 +101,8 @@ class QdrantManager:
         
         # Config file is always in the qdrant_dir
         self.config_path = os.path.join(self.qdrant_dir, "config.yaml")
+        # Storage for embedded mode (QDRANT_MODE = "embedded"), kept apart from the server's data
+        self.embedded_dir = config.QDRANT_EMBEDDED_PATH or os.path.join(self.qdrant_dir, "embedded")
         
         logger.info(f"Qdrant binary path: {self.binary_path}")
         logger.info(f"Qdrant data directory: {self.data_dir}")
@@ -166,8 +172,28 @@ service:
                 
         return True
     
+    def _wait_until_ready(self):
+        """Poll the server's readiness endpoint until it answers, the process exits or the timeout passes"""
+        ready_url = f"{config.QDRANT_HOST}:{config.QDRANT_PORT}/readyz"
+        deadline = time.monotonic() + config.QDRANT_STARTUP_TIMEOUT
+        while time.monotonic() < deadline and self.process.poll() is None:
+            try:
+                with urllib.request.urlopen(ready_url, timeout=1) as response:
+                    if response.status == 200:
+                        return True
+            except (urllib.error.URLError, OSError):
+                pass
+            time.sleep(0.1)
+        return False
+    
     def start_server(self):
         """Start the Qdrant server process"""
+        if config.QDRANT_MODE == "embedded":
+            # The client runs Qdrant in-process on this directory; nothing to launch
+            os.makedirs(self.embedded_dir, exist_ok=True)
+            print(f"Using embedded Qdrant storage: {self.embedded_dir}")
+            return True
+        
         print("DEBUG: About to start Qdrant server")
         logger.info(f"Starting Qdrant from {self.binary_path}")
         logger.info(f"Qdrant storage location: {self.data_dir}")
@@ -221,16 +247,19 @@ service:
                 print(f"Attempting Qdrant launch method {method_number}...")
                 
                 try:
+                    launch_time = time.perf_counter()
                     self.process = launch_method()
                     
                     # Wait for Qdrant to initialize
-                    time.sleep(5)
+                    ready = self._wait_until_ready()
                     
                     # Check if process is still running
                     if self.process.poll() is None:
                         # Process is still running, success!
+                        if not ready:
+                            logger.warning(f"Qdrant did not report ready within {config.QDRANT_STARTUP_TIMEOUT}s")
                         logger.info(f"Qdrant started successfully using method {method_number}")
-                        print(f"Qdrant started successfully using method {method_number}")
+                        print(f"Qdrant started successfully using method {method_number} in {time.perf_counter() - launch_time:.2f}s")
                         return True
                     else:
                         # Process exited - read error output and try next method
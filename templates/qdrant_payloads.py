@@ -0,0 +1,29 @@
+from qdrant_client.models import PointStruct, models
+
+
+def memory_point(point_id: str, payload: dict, dense, sparse, multivector) -> PointStruct:
+    """
+    Build the Qdrant point for one memory from numpy embeddings.
+
+    Each array is turned into a flat Python list with a single tolist() call
+    before validation: pydantic copies numpy arrays element by element,
+    which is several times slower. The client converts the point for its
+    transport (gRPC or JSON), so the same point also works with the
+    embedded local client.
+
+    `sparse` is a fastembed SparseEmbedding (indices / values arrays).
+    """
+    return PointStruct(
+        id=point_id,
+        payload=payload,
+        vector={
+            "dense_embedding": dense.tolist(),
+            "bm25_embedding": sparse_vector(sparse),
+            "late_interaction_embedding": multivector.tolist(),
+        },
+    )
+
+
+def sparse_vector(sparse) -> models.SparseVector:
+    """SparseVector straight from a fastembed SparseEmbedding's arrays (no dict round trip)."""
+    return models.SparseVector(indices=sparse.indices.tolist(), values=sparse.values.tolist())
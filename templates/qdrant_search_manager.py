@@ -1,70 +1,134 @@
+import asyncio
+import time
 import uuid
 from datetime import datetime
 
-from qdrant_client.models import PointStruct
 from qdrant_client import AsyncQdrantClient
 from semantic_kernel import Kernel
 from semantic_kernel.data import VectorSearchOptions
-from config import QDRANT_COLLECTION
+from config import (
+    QDRANT_COLLECTION, MEMORY_SEARCH_RERANK_MIN_POINTS, MEMORY_SEARCH_LATENCY_BUDGET_MS,
+    MEMORY_SEARCH_COUNT_REFRESH_SECONDS, MEMORY_SEARCH_TOP_K, MEMORY_SCORE_THRESHOLD,
+    MEMORY_DENSE_SCORE_THRESHOLD, SPARSE_EMBEDDING_MODEL_NAME, LATE_INTERACTION_EMBEDDING_MODEL_NAME,
+)
+from inference_executor import inference_executor
+from embedding_cache import embedding_cache
+from memory_relevance import select_memories
+from qdrant_collection import dense_search_params
+from multivector_pooling import pool_multivector
+from qdrant_payloads import memory_point, sparse_vector
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import models
 
 
 
-async def store_memory_local(kernel: Kernel, user_id: str, memory_text: str, category: str):
+async def store_memories_local(kernel: Kernel, memories: list):
     """
-    Stores a memory in the Qdrant vector store with a unique ID.
-    
-    This function:
-      - Checks that the Qdrant collection ("qdrant_client") is available.
-      - Uses the Qdrant vectorizer ("vectorizer_local") to generate an embedding.
-      - Upserts the record into the Qdrant collection.
+    Stores several memories in the Qdrant vector store in one batch.
+
+    Args:
+        memories: A list of (user_id, memory_text, category) tuples.
+
+    All texts are embedded together for each of the dense, sparse and
+    late-interaction models, then written with a single upsert.
     """
     if "qdrant_client" not in kernel.services:
         print("Qdrant vector store is not available.")
         return
 
+    if not memories:
+        return
+
+    qdrant_client = kernel.services.get("qdrant_client")
+    records = await build_memory_points(kernel, memories)
+    await qdrant_client.upsert(collection_name=QDRANT_COLLECTION, points=records)
+
+async def build_memory_points(kernel: Kernel, memories: list) -> list:
+    """
+    Embeds memories with the dense, sparse and late-interaction models and
+    returns them as Qdrant points, ready to upsert (see qdrant_payloads).
+
+    Args:
+        memories: A list of (user_id, memory_text, category) tuples, optionally
+            with an ISO timestamp as a fourth element (defaults to now).
+    """
     vectorizer = kernel.services.get("vectorizer_local")
     bm25_model = kernel.services.get("bm25_embedding_model")
     late_interaction_embedding_model = kernel.services.get("late_interaction_embedding_model")
-    qdrant_client = kernel.services.get("qdrant_client")
-
-    # Create a unique memory ID (combining user_id, current timestamp, and a short uuid)
-    user_id = str(uuid.uuid4())
 
-    dense_embedding = (await vectorizer.kernel.get_service("dense_embedding_model").generate_raw_embeddings([memory_text]))[0]
+    texts = [memory[1] for memory in memories]
 
+    dense_embeddings = await vectorizer.kernel.get_service("dense_embedding_model").generate_raw_embeddings(texts)
 
-    bm25_embedding = list(bm25_model.embed(memory_text))[0]
+    bm25_embeddings = await inference_executor.run(
+        lambda: list(bm25_model.embed(texts)), label="bm25_embed"
+    )
     
-    late_interaction_embedding = list(late_interaction_embedding_model.embed(memory_text))[0]
-
-    record = PointStruct(
-        id=user_id,
-        payload={
-            "memory_text": memory_text,
-            "category": category,
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-        },
-        vector={
-            "dense_embedding": dense_embedding,
-            "bm25_embedding": bm25_embedding.as_object(),
-            "late_interaction_embedding": late_interaction_embedding.tolist(),
-        },
+    # Optionally pool similar token vectors to shrink the stored multivectors
+    late_interaction_embeddings = await inference_executor.run(
+        lambda: [pool_multivector(embedding) for embedding in late_interaction_embedding_model.embed(texts)],
+        label="colbert_embed",
     )
 
-    await qdrant_client.upsert(collection_name=QDRANT_COLLECTION, points=[record])
+    records = []
+    for memory, dense_embedding, bm25_embedding, late_interaction_embedding in zip(
+        memories, dense_embeddings, bm25_embeddings, late_interaction_embeddings
+    ):
+        memory_text, category = memory[1], memory[2]
+        timestamp = memory[3] if len(memory) > 3 and memory[3] else datetime.utcnow().isoformat() + "Z"
+        records.append(memory_point(
+            # Create a unique memory ID
+            str(uuid.uuid4()),
+            payload={
+                "memory_text": memory_text,
+                "category": category,
+                "timestamp": timestamp,
+            },
+            dense=dense_embedding,
+            sparse=bm25_embedding,
+            multivector=late_interaction_embedding,
+        ))
+    return records
+
+# Cached approximate collection size, used to decide whether ColBERT reranking is worthwhile
+_collection_size = {"count": None, "checked_at": 0.0}
+
+async def _should_rerank(qdrant_client: AsyncQdrantClient) -> bool:
+    """Return False when the collection is too small for ColBERT reranking to pay off."""
+    if not MEMORY_SEARCH_RERANK_MIN_POINTS:
+        return True
+
+    now = time.monotonic()
+    if _collection_size["count"] is None or now - _collection_size["checked_at"] > MEMORY_SEARCH_COUNT_REFRESH_SECONDS:
+        try:
+            result = await qdrant_client.count(QDRANT_COLLECTION, exact=False)
+            _collection_size["count"] = result.count
+            _collection_size["checked_at"] = now
+        except Exception as e:
+            print(f"Could not count Qdrant collection: {e}")
+            return True
+
+    return _collection_size["count"] >= MEMORY_SEARCH_RERANK_MIN_POINTS
 
 # Note: QdrantCollection does not support text search.
-async def search_memory_local(kernel: Kernel, query: str):
+async def search_memory_local(kernel: Kernel, query: str, with_scores: bool = False):
     """
     Searches the Qdrant vector store for memories that match the query.
     
     This function:
-     1. Generates dense, sparse, and late-interaction embeddings for the query.
-     2. Does vector search on Qdrant collection using all three embeddings.
-     3. Reranks results to find best matches.
-     4. Returns the memory texts from the top results.
+     1. Generates dense, sparse, and late-interaction embeddings for the query concurrently.
+     2. Does vector search on Qdrant collection using the dense and sparse embeddings.
+     3. Reranks results with the late-interaction embedding to find best matches.
+        Reranking is skipped (candidates are ranked by dense similarity instead)
+        when the collection is small or the ColBERT embedding misses the latency budget.
+     4. Filters the results by relevance and returns the memory texts, best first.
+        With with_scores=True, (memory_text, score) pairs are returned instead.
+
+    Reranked results are gated by MEMORY_SCORE_THRESHOLD on the ColBERT score
+    normalised by query length and the relative cutoff. Without reranking,
+    the dense and sparse candidates are gated by MEMORY_DENSE_SCORE_THRESHOLD
+    on their dense cosine similarity, so keyword-only matches that mean
+    something else are dropped.
     """
     
     vectorizer = kernel.services.get("vectorizer_local")
@@ -75,38 +139,112 @@ async def search_memory_local(kernel: Kernel, query: str):
     if "qdrant_client" not in kernel.services:
         print("Qdrant vector store is not available.")
         return []
-    
-    dense_vectors = (await vectorizer.kernel.get_service("dense_embedding_model").generate_raw_embeddings([query]))[0]
-    sparse_vectors = next(bm25_model.query_embed(query))
-    late_vectors = next(late_interaction_embedding_model.query_embed(query))
 
-    # Rerank the results based on the query
+    start_time = time.perf_counter()
+
+    dense_embedding_model = vectorizer.kernel.get_service("dense_embedding_model")
+
+    async def embed_dense():
+        return (await dense_embedding_model.generate_raw_embeddings([query]))[0]
+
+    async def embed_sparse():
+        return await inference_executor.run(
+            lambda: next(bm25_model.query_embed(query)), label="bm25_query_embed"
+        )
+
+    async def embed_late():
+        return await inference_executor.run(
+            lambda: next(late_interaction_embedding_model.query_embed(query)), label="colbert_query_embed"
+        )
+
+    # The three query embeddings are independent, so compute them concurrently.
+    # Repeated queries are served from the shared embedding cache, keyed by model.
+    # The fastembed models are named from config: reading them off a deferred
+    # model would load it here on the event loop.
+    dense_task = asyncio.ensure_future(
+        embedding_cache.get_or_compute(f"dense:{dense_embedding_model.ai_model_id}", query, embed_dense)
+    )
+    sparse_task = asyncio.ensure_future(
+        embedding_cache.get_or_compute(f"bm25:{SPARSE_EMBEDDING_MODEL_NAME}", query, embed_sparse)
+    )
+    late_task = None
+    try:
+        if await _should_rerank(qdrant_client):
+            late_task = asyncio.ensure_future(
+                embedding_cache.get_or_compute(f"colbert:{LATE_INTERACTION_EMBEDDING_MODEL_NAME}", query, embed_late)
+            )
+
+        dense_vectors, sparse_vectors = await asyncio.gather(dense_task, sparse_task)
+    except BaseException:
+        # Don't leave the other embeddings holding executor threads, or their errors unretrieved
+        for task in (dense_task, sparse_task, late_task):
+            if task is not None:
+                task.cancel()
+                task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        raise
+
+    late_vectors = None
+    if late_task is not None:
+        if MEMORY_SEARCH_LATENCY_BUDGET_MS is None:
+            late_vectors = await late_task
+        else:
+            remaining = MEMORY_SEARCH_LATENCY_BUDGET_MS / 1000 - (time.perf_counter() - start_time)
+            try:
+                late_vectors = await asyncio.wait_for(asyncio.shield(late_task), timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                # Let the embedding finish in the background, but don't wait for it
+                late_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+                print(f"ColBERT query embedding exceeded {MEMORY_SEARCH_LATENCY_BUDGET_MS} ms budget, skipping rerank")
+
     prefetch = [
         models.Prefetch(
-            query=dense_vectors,
+            query=dense_vectors.tolist(),
             using="dense_embedding",
+            params=dense_search_params(),
             limit=10,
         ),
         models.Prefetch(
-            query=models.SparseVector(**sparse_vectors.as_object()),
+            query=sparse_vector(sparse_vectors),
             using="bm25_embedding",
             limit=10,
         ),
     ]
 
-    vector_results = await qdrant_client.query_points(
-         QDRANT_COLLECTION,
-        prefetch=prefetch,
-        query=late_vectors,
-        using="late_interaction_embedding",
-        with_payload=True,
-        limit=5,
-    )
-
-    memory_results = set()
-
-# Iterate over the retrieved results
-    for result in vector_results.points:
-        memory_results.add(result.payload.get("memory_text"))
-
-    return memory_results
+    if late_vectors is not None:
+        # Rerank the results based on the query
+        vector_results = await qdrant_client.query_points(
+             QDRANT_COLLECTION,
+            prefetch=prefetch,
+            query=late_vectors,
+            using="late_interaction_embedding",
+            with_payload=True,
+            limit=MEMORY_SEARCH_TOP_K,
+        )
+    else:
+        # Fast path: rescore the dense and sparse candidates by dense similarity.
+        # Unlike RRF scores, cosine similarity can be gated by an absolute threshold.
+        vector_results = await qdrant_client.query_points(
+            QDRANT_COLLECTION,
+            prefetch=prefetch,
+            query=dense_vectors.tolist(),
+            using="dense_embedding",
+            score_threshold=MEMORY_DENSE_SCORE_THRESHOLD,
+            with_payload=True,
+            limit=MEMORY_SEARCH_TOP_K,
+        )
+
+    if late_vectors is not None:
+        # MaxSim sums one similarity per query token; normalise to a 0-1 scale
+        scored_memories = [
+            (result.payload.get("memory_text"), result.score / len(late_vectors))
+            for result in vector_results.points
+        ]
+        memory_results = select_memories(scored_memories, threshold=MEMORY_SCORE_THRESHOLD)
+    else:
+        scored_memories = [(result.payload.get("memory_text"), result.score) for result in vector_results.points]
+        # Cosine similarities cluster closely, so the relative cutoff would drop good matches
+        memory_results = select_memories(scored_memories, relative_cutoff=None)
+
+    if with_scores:
+        return memory_results
+    return [memory_text for memory_text, _ in memory_results]
@@ -1,22 +1,36 @@
+import time
+_import_start_time = time.perf_counter()
+
 import config
+config.RUNNING_AS_SERVER = True  # Set before importing chatbot so it skips CLI-only speech input
+
+import asyncio
 import os
 import sys
-import time
+import json
 import aiohttp
 from fastapi import FastAPI, BackgroundTasks
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from contextlib import asynccontextmanager
 
-from chatbot import initialize_chatbot, process_message, reset_chatbot_state
+import chatbot
+from chatbot import initialize_chatbot, reload_chatbot, process_message, stream_message, session_manager
+from embedding_cache import embedding_cache
+from inference_executor import inference_executor
+from memory_writer import memory_write_queue
+from history_summarizer import history_summarizer
+from memory_ingestion import ingest_memories, memory_from_record
 from qdrant_manager import QdrantManager
-from offline_text_to_speech import speak_text_to_bytes
-try:
-    from azure_text_to_speech import text_to_speech_to_bytes
-except ImportError:
-    print("Azure speech modules not available. Only offline speech will work.")
-
-config.RUNNING_AS_SERVER = True
+from services import close_services
+from audio_utils import AUDIO_MEDIA_TYPES
+from azure_synthesizer_pool import synthesizer_pool
+from speech_pipeline import stream_speech_wav, stream_with_speech, synthesize_speech
+from tts_cache import audio_cache
+from warmup import readiness, warm_up_models
+from lazy_loader import import_profile, record_import
+# Speech engines (Coqui TTS, Azure Speech) are imported lazily by speech_pipeline when first used
 
 def debug_print(message):
     """Print a timestamped debug message"""
@@ -27,6 +41,8 @@ debug_print("Server module imported")
 
 _http_client = None
 _qdrant_manager = QdrantManager()
+_warmup_task = None
+_bulk_ingestion = {"running": 0, "last": None}  # Background bulk ingestions, for /api/metrics
 
 def get_http_client():
     global _http_client
@@ -37,6 +53,7 @@ def get_http_client():
 @asynccontextmanager
 async def lifespan(app):
     print("Starting up server...")
+    print(f"Import profile (ms): {import_profile()}")
     
     debug_print("About to initialize Qdrant")
     if not _qdrant_manager.start_server():
@@ -45,18 +62,34 @@ async def lifespan(app):
     
     debug_print("About to initialize AI services")
     await initialize_chatbot()
+    memory_write_queue.start()
+
+    # Warm up models in the background; /ready reports when this finishes
+    global _warmup_task
+    _warmup_task = asyncio.create_task(warm_up_models(chatbot.kernel))
     
     yield
     
     print("Shutting down server...")
+
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+
+    debug_print("Flushing pending memory writes")
+    await memory_write_queue.stop()
+    await history_summarizer.stop()
     
     global _http_client
     if _http_client is not None and not _http_client.closed:
         await _http_client.close()
         _http_client = None
     
+    await close_services()
     _qdrant_manager.stop_server()
 
+    inference_executor.shutdown()
+    synthesizer_pool.close()
+
 debug_print("About to create FastAPI app")
 app = FastAPI(lifespan=lifespan)
 
@@ -68,8 +101,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def _reload_and_warm_up():
+    """Swap in a kernel for the new config, then warm up only the models it newly loaded"""
+    try:
+        await reload_chatbot()
+        await warm_up_models(chatbot.kernel, only_new=True)
+    except Exception as e:
+        print(f"Error reinitializing chatbot: {str(e)}")
+
 class UserInput(BaseModel):
     message: str
+    session_id: str | None = None
+
+class MemoryRecord(BaseModel):
+    memory_text: str
+    category: str | None = None
+    user_id: str | None = None
+    timestamp: str | None = None
+
+class BulkMemories(BaseModel):
+    memories: list[MemoryRecord]
 
 class ModelConfig(BaseModel):
     use_ollama: bool
@@ -79,9 +130,85 @@ class ModelConfig(BaseModel):
 
 @app.post("/api/chat")
 async def chat(input_data: UserInput):
-    response = await process_message(input_data.message)
+    response = await process_message(input_data.message, session_id=input_data.session_id)
     return {"response": response}
 
+@app.post("/api/chat/stream")
+async def chat_stream(input_data: UserInput):
+    """Stream the chatbot response as newline-delimited JSON (NDJSON).
+
+    Each line is one event: {"type": "delta", "content": ...} for every chunk,
+    then a final {"type": "done", "response": ..., "timings": {...}, "context": {...}} frame
+    (or {"type": "error", "message": ...} if generation failed).
+    """
+    async def event_stream():
+        async for event in stream_message(input_data.message, session_id=input_data.session_id):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/api/chat/speech-stream")
+async def chat_speech_stream(input_data: UserInput):
+    """Stream the chatbot response with sentence-level audio as NDJSON.
+
+    Emits the same events as /api/chat/stream, plus
+    {"type": "audio", "index": ..., "text": ..., "audio": <base64 WAV>} for
+    each sentence, synthesized while the model is still generating.
+    """
+    avatar_gender = getattr(config, 'AVATAR_TYPE', 'male')
+    gender = avatar_gender if avatar_gender in ["male", "female"] else "male"
+
+    async def event_stream():
+        events = stream_message(input_data.message, session_id=input_data.session_id)
+        if config.USE_SPEECH_OUTPUT:
+            events = stream_with_speech(events, gender=gender)
+        async for event in events:
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.delete("/api/sessions/{session_id}")
+async def end_session(session_id: str):
+    """Forget the conversation history of a session"""
+    removed = session_manager.remove(session_id)
+    return {"status": "success" if removed else "info", "session_id": session_id}
+
+async def _ingest_in_background(memories: list):
+    """Run a bulk ingestion after the response is sent; the result is reported in /api/metrics"""
+    _bulk_ingestion["running"] += 1
+    try:
+        await initialize_chatbot()
+        _bulk_ingestion["last"] = await ingest_memories(chatbot.kernel, memories)
+    except Exception as e:
+        print(f"Error ingesting memories: {str(e)}")
+        _bulk_ingestion["last"] = {"error": str(e)}
+    finally:
+        _bulk_ingestion["running"] -= 1
+
+@app.post("/api/memories/bulk")
+async def bulk_ingest_memories(input_data: BulkMemories, background_tasks: BackgroundTasks):
+    """Queue many memories for storage; they are embedded and uploaded in batches in the background"""
+    if len(input_data.memories) > config.INGEST_MAX_REQUEST_MEMORIES:
+        return JSONResponse(
+            content={
+                "status": "error",
+                "message": f"At most {config.INGEST_MAX_REQUEST_MEMORIES} memories per request",
+            },
+            status_code=413,
+        )
+    memories = [memory_from_record(record.model_dump(), config.USER_ID) for record in input_data.memories]
+    memories = [memory for memory in memories if memory is not None]
+    background_tasks.add_task(_ingest_in_background, memories)
+    return {"status": "accepted", "memories": len(memories)}
+
 @app.get("/api/config")
 async def get_config():
     """Get current configuration"""
@@ -119,8 +246,6 @@ async def update_config(model_config: ModelConfig, background_tasks: BackgroundT
                 }
             config.OLLAMA_MODEL_ID = model_config.model_id
 
-        reset_chatbot_state()
-
         mode = "Offline" if model_config.use_ollama else "Online"
         model_name = model_config.model_id if model_config.use_ollama else config.AZURE_DEPLOYMENT_NAME
         speech_status = "enabled" if model_config.use_speech else "disabled"
@@ -137,7 +262,8 @@ async def update_config(model_config: ModelConfig, background_tasks: BackgroundT
 
         if needs_reinitialization:
             print(f"Configuration changed, reinitializing chatbot: {model_name} ({mode})")
-            background_tasks.add_task(initialize_chatbot)
+            # Loaded models are kept; only the chat service is swapped once ready
+            background_tasks.add_task(_reload_and_warm_up)
             return {
                 "status": "success", 
                 "message": f"Configuration updated: {model_name} ({mode} mode), speech {speech_status}{avatar_message}"
@@ -161,16 +287,20 @@ async def update_config(model_config: ModelConfig, background_tasks: BackgroundT
         }
 
 @app.post("/api/text-to-speech")
-async def convert_text_to_speech(input_data: UserInput):
-    """Convert text to speech and return audio bytes"""
+async def convert_text_to_speech(input_data: UserInput, format: str = "wav"):
+    """Convert text to speech and return audio bytes (format: wav, pcm or opus)"""
     try:
         from fastapi.responses import Response
+
+        if format not in AUDIO_MEDIA_TYPES:
+            format = "wav"
+        media_type = AUDIO_MEDIA_TYPES[format]
         
         if not config.USE_SPEECH_OUTPUT:
-            return Response(content=b"", media_type="audio/wav")
+            return Response(content=b"", media_type=media_type)
         
         if not input_data or not input_data.message or not input_data.message.strip():
-            return Response(content=b"", media_type="audio/wav")
+            return Response(content=b"", media_type=media_type)
         
         avatar_gender = getattr(config, 'AVATAR_TYPE', 'male')
         gender = avatar_gender if avatar_gender in ["male", "female"] else "male"
@@ -178,10 +308,8 @@ async def convert_text_to_speech(input_data: UserInput):
         audio_bytes = None
         
         try:
-            if config.USE_OLLAMA:
-                audio_bytes = speak_text_to_bytes(input_data.message, gender=gender)
-            else:
-                audio_bytes = text_to_speech_to_bytes(input_data.message, gender=gender)
+            # Synthesized per sentence on the inference executor, reusing cached audio
+            audio_bytes = await synthesize_speech(input_data.message, gender=gender, audio_format=format)
                 
             if not audio_bytes:
                 print("Warning: No audio generated")
@@ -192,7 +320,7 @@ async def convert_text_to_speech(input_data: UserInput):
             traceback.print_exc()
             audio_bytes = b""
         
-        return Response(content=audio_bytes, media_type="audio/wav")
+        return Response(content=audio_bytes, media_type=media_type)
     except Exception as e:
         print(f"Error in text-to-speech endpoint: {str(e)}")
         import traceback
@@ -200,6 +328,36 @@ async def convert_text_to_speech(input_data: UserInput):
         from fastapi.responses import Response
         return Response(content=b"", media_type="audio/wav")
 
+@app.post("/api/text-to-speech/stream")
+async def stream_text_to_speech(input_data: UserInput, format: str = "wav"):
+    """Stream synthesized audio sentence by sentence.
+
+    format=wav sends a WAV header with streaming length followed by PCM frames;
+    format=pcm sends raw little-endian 16-bit mono PCM (sample rate in the
+    X-Sample-Rate header). It is not labelled audio/L16, which is big-endian.
+    Playback can start as soon as the first sentence has been synthesized.
+    """
+    from fastapi.responses import Response
+
+    if not config.USE_SPEECH_OUTPUT or not input_data.message or not input_data.message.strip():
+        return Response(content=b"", media_type="audio/wav")
+
+    avatar_gender = getattr(config, 'AVATAR_TYPE', 'male')
+    gender = avatar_gender if avatar_gender in ["male", "female"] else "male"
+
+    include_header = format != "pcm"
+    try:
+        sample_rate, chunks = await stream_speech_wav(input_data.message, gender=gender, include_header=include_header)
+    except Exception as e:
+        print(f"Error in streaming text-to-speech: {str(e)}")
+        return Response(content=b"", media_type="audio/wav")
+
+    if chunks is None:
+        return Response(content=b"", media_type="audio/wav")
+
+    media_type = "audio/wav" if include_header else f"audio/pcm; rate={sample_rate}; encoding=s16le; channels=1"
+    return StreamingResponse(chunks, media_type=media_type, headers={"X-Sample-Rate": str(sample_rate)})
+
 # Add this route to your FastAPI application
 
 @app.get("/api/azure-credentials")
@@ -209,6 +367,21 @@ async def get_azure_credentials():
         "region": os.environ.get("AZURE_SPEECH_REGION")
     }
 
+@app.get("/api/metrics")
+def get_metrics():
+    """Runtime metrics for the inference executor, memory writes, sessions, summaries and caches"""
+    return {
+        "inference": inference_executor.stats(),
+        "memory_writes": memory_write_queue.stats(),
+        "sessions": session_manager.stats(),
+        "history_summaries": history_summarizer.stats(),
+        "bulk_ingestion": dict(_bulk_ingestion),
+        "embedding_cache": embedding_cache.stats(),
+        "tts_cache": audio_cache.stats(),
+        "azure_synthesizer_pool": synthesizer_pool.stats(),
+        "import_profile_ms": import_profile(),
+    }
+
 # Add this endpoint near your other route definitions
 
 @app.get("/health")
@@ -216,5 +389,13 @@ def health_check():
     """Health check endpoint to verify the server is running"""
     return {"status": "ok"}
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness endpoint: 200 once every loaded model is warmed up, 503 before that"""
+    report = readiness.report()
+    return JSONResponse(content=report, status_code=200 if report["ready"] else 503)
+
+record_import("server", time.perf_counter() - _import_start_time)
+
 debug_print("About to start Uvicorn server")
 
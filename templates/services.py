@@ -1,4 +1,6 @@
 # services.py
+import asyncio
+import time
 from openai import AsyncOpenAI
 from semantic_kernel import Kernel
 from semantic_kernel.connectors.ai.open_ai import (
@@ -7,17 +9,65 @@ from semantic_kernel.connectors.ai.open_ai import (
 from semantic_kernel.connectors.memory.azure_ai_search import AzureAISearchCollection
 from semantic_kernel.data import VectorStoreRecordUtils
 from granite_embedding_service import GraniteEmbeddingService
-from qdrant_client import AsyncQdrantClient
-from qdrant_client.models import VectorParams, Distance, models
 from data_model import ElderlyUserMemory
 import config
 from config import (
     OLLAMA_BASE_URL, AZURE_API_KEY, AZURE_ENDPOINT, AZURE_DEPLOYMENT_NAME,
     AZURE_AI_SEARCH_INDEX, AZURE_AI_SEARCH_ENDPOINT, AZURE_AI_SEARCH_KEY,
     AZURE_OPENAI_EMBEDDING_API_KEY, AZURE_OPENAI_EMBEDDING_ENDPOINT, AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-    QDRANT_COLLECTION, QDRANT_HOST, QDRANT_PORT, DENSE_VECTOR_SIZE, LATE_INTERACTION_VECTOR_SIZE, SPARSE_EMBEDDING_MODEL_NAME, LATE_INTERACTION_EMBEDDING_MODEL_NAME,
+    SPARSE_EMBEDDING_MODEL_NAME, LATE_INTERACTION_EMBEDDING_MODEL_NAME,
 )
 from fastembed import LateInteractionTextEmbedding, SparseTextEmbedding
+from lazy_loader import LazyModel
+from qdrant_collection import ensure_collection
+from qdrant_connection import create_qdrant_client
+
+# Loaded components (embedding models, Qdrant client, Azure embedding/search clients)
+# are kept here across kernel rebuilds, so a config change only swaps the
+# chat-completion service instead of reloading every model.
+_service_registry = {}
+
+async def _get_or_create(name: str, create):
+    """Return a registered component, creating it once with the `create` coroutine factory.
+    Concurrent callers for the same name share one load."""
+    if name not in _service_registry:
+        _service_registry[name] = asyncio.ensure_future(create())
+    try:
+        return await _service_registry[name]
+    except Exception:
+        # Don't cache failures, let the next initialisation retry
+        _service_registry.pop(name, None)
+        raise
+
+async def close_services():
+    """Close network clients held in the registry (e.g. the Qdrant channel) on shutdown."""
+    future = _service_registry.pop("qdrant_client", None)
+    if future is not None and future.done() and not future.cancelled() and not future.exception():
+        await future.result().close()
+
+def _timed_load(name: str, factory):
+    """Load a component and log how long it took."""
+    start_time = time.perf_counter()
+    component = factory()
+    print(f"Loaded {name} in {time.perf_counter() - start_time:.2f}s")
+    return component
+
+async def _load_component(name: str, factory):
+    """Load a component on a worker thread, or defer it until first use if configured."""
+    if name in config.DEFERRED_COMPONENTS:
+        print(f"Deferring {name} until first use")
+        return LazyModel(name, factory)
+    return await asyncio.to_thread(_timed_load, name, factory)
+
+async def _connect_qdrant():
+    """Create the Qdrant client and make sure the collection exists with the configured layout."""
+    start_time = time.perf_counter()
+    qdrant_client = create_qdrant_client()
+
+    # Create the collection if needed (existing ones are only migrated when QDRANT_MIGRATE_COLLECTION is on)
+    await ensure_collection(qdrant_client)
+    print(f"Connected to Qdrant in {time.perf_counter() - start_time:.2f}s")
+    return qdrant_client
 
 async def initialize_ai_service(kernel: Kernel):
     """Initializes AI services in the Kernel dynamically."""
@@ -37,52 +87,44 @@ async def initialize_ai_service(kernel: Kernel):
         )
         model_name = f"Ollama Model: {config.OLLAMA_MODEL_ID}"
 
-        # Initialize Dense Embedding Model
-        dense_embedding_model = GraniteEmbeddingService(
-            service_id="dense_embedding_model"
+        # Load the embedding models and connect to Qdrant concurrently (reused if already loaded)
+        start_time = time.perf_counter()
+        (
+            dense_embedding_model,
+            bm25_embedding_model,
+            late_interaction_embedding_model,
+            qdrant_client,
+        ) = await asyncio.gather(
+            # Dense embedding model is registered as a kernel service, so it is never deferred
+            _get_or_create("dense_embedding_model", lambda: asyncio.to_thread(
+                _timed_load, "dense_embedding_model",
+                lambda: GraniteEmbeddingService(service_id="dense_embedding_model"),
+            )),
+            _get_or_create("bm25_embedding_model", lambda: _load_component(
+                "bm25_embedding_model",
+                lambda: SparseTextEmbedding(SPARSE_EMBEDDING_MODEL_NAME),
+            )),
+            _get_or_create("late_interaction_embedding_model", lambda: _load_component(
+                "late_interaction_embedding_model",
+                lambda: LateInteractionTextEmbedding(LATE_INTERACTION_EMBEDDING_MODEL_NAME),
+            )),
+            _get_or_create("qdrant_client", _connect_qdrant),
         )
+        print(f"Local AI services initialized in {time.perf_counter() - start_time:.2f}s")
+
+        # Initialize Dense Embedding Model
         kernel.add_service(dense_embedding_model)
         
         # Initilize Sparse Embedding Model
-        bm25_embedding_model = SparseTextEmbedding(SPARSE_EMBEDDING_MODEL_NAME)
         kernel.services["bm25_embedding_model"] = bm25_embedding_model
 
         # Initialize Late Interaction Embedding Model
-        late_interaction_embedding_model = LateInteractionTextEmbedding(LATE_INTERACTION_EMBEDDING_MODEL_NAME)
         kernel.services["late_interaction_embedding_model"] = late_interaction_embedding_model
 
         # Initialize vectorizer
         vectorizer_local = VectorStoreRecordUtils(kernel)
         kernel.services["vectorizer_local"] = vectorizer_local
 
-        qdrant_client = AsyncQdrantClient(url=QDRANT_HOST, port=QDRANT_PORT)
-
-        # Check if the collection exists, if not initialise it
-        collections_response = await qdrant_client.get_collections()
-        existing_collections = [c.name for c in collections_response.collections]
-        
-        if QDRANT_COLLECTION not in existing_collections:
-            await qdrant_client.create_collection(
-            collection_name=QDRANT_COLLECTION,
-            vectors_config={
-                "dense_embedding": VectorParams(
-                size=DENSE_VECTOR_SIZE,
-                distance=Distance.COSINE,
-                ),
-                "late_interaction_embedding": VectorParams(
-                size=LATE_INTERACTION_VECTOR_SIZE,
-                distance=Distance.COSINE,
-                multivector_config=models.MultiVectorConfig(
-                    comparator=models.MultiVectorComparator.MAX_SIM,
-                )
-                ),
-            },
-            sparse_vectors_config={
-                "bm25_embedding": models.SparseVectorParams(
-                modifier=models.Modifier.IDF
-                )
-            }
-            )
         kernel.services["qdrant_client"] = qdrant_client # Add Qdrant Client to Kernel
 
 
@@ -100,12 +142,27 @@ async def initialize_ai_service(kernel: Kernel):
         model_name = f"Azure OpenAI Model: {AZURE_DEPLOYMENT_NAME}"
         service_id="azure"
 
-        # Add Azure OpenAI Embeddings (For Vector Search)
-        embedding_service = AzureTextEmbedding(
-            service_id="embedding",
-            api_key=AZURE_OPENAI_EMBEDDING_API_KEY,
-            deployment_name=AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-            endpoint=AZURE_OPENAI_EMBEDDING_ENDPOINT
+        # Add Azure OpenAI Embeddings (For Vector Search), reused across kernel rebuilds
+        async def create_embedding_service():
+            return AzureTextEmbedding(
+                service_id="embedding",
+                api_key=AZURE_OPENAI_EMBEDDING_API_KEY,
+                deployment_name=AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+                endpoint=AZURE_OPENAI_EMBEDDING_ENDPOINT
+            )
+
+        # Initialize Azure AI Search Collection
+        async def create_collection():
+            return AzureAISearchCollection[ElderlyUserMemory](
+                collection_name=AZURE_AI_SEARCH_INDEX,
+                data_model_type=ElderlyUserMemory,
+                endpoint=AZURE_AI_SEARCH_ENDPOINT,
+                api_key=AZURE_AI_SEARCH_KEY
+            )
+
+        embedding_service, collection = await asyncio.gather(
+            _get_or_create("azure_embedding", create_embedding_service),
+            _get_or_create("azure_search_collection", create_collection),
         )
         kernel.add_service(embedding_service)
 
@@ -113,13 +170,6 @@ async def initialize_ai_service(kernel: Kernel):
         vectorizer = VectorStoreRecordUtils(kernel)
         kernel.services["vectorizer"] = vectorizer  
 
-        # Initialize Azure AI Search Collection
-        collection = AzureAISearchCollection[ElderlyUserMemory](
-            collection_name=AZURE_AI_SEARCH_INDEX,
-            data_model_type=ElderlyUserMemory,
-            endpoint=AZURE_AI_SEARCH_ENDPOINT,
-            api_key=AZURE_AI_SEARCH_KEY
-        )
         kernel.services["collection"] = collection 
 
     return service_id, model_name, kernel
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+from semantic_kernel.contents import ChatHistoryTruncationReducer
+
+import config
+
+
+class ChatSession:
+    """Conversation state for a single user/session."""
+
+    def __init__(self, session_id: str, target_count: int):
+        self.session_id = session_id
+        # With summarization on, older turns are folded into history_summary in the
+        # background; the reducer only drops turns the summarizer hasn't caught up with
+        threshold_count = config.HISTORY_SUMMARY_MAX_BACKLOG if config.HISTORY_SUMMARY_ENABLED else 0
+        self.truncation_reducer = ChatHistoryTruncationReducer(target_count=target_count, threshold_count=threshold_count)
+        self.history_summary = ""
+        self.summary_task = None
+        # Serialises turns within one session; different sessions run in parallel
+        self.lock = asyncio.Lock()
+        # Turns running or waiting for the lock (waiting ones must keep the session alive too)
+        self.active_turns = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def turn(self):
+        """Hold the session lock for one turn; the session counts as in use while waiting for it."""
+        self.active_turns += 1
+        try:
+            async with self.lock:
+                yield self
+        finally:
+            self.active_turns -= 1
+            self.touch()
+
+    def approximate_size(self) -> int:
+        """Approximate memory held by this session, in characters of message content."""
+        return len(self.history_summary) + sum(len(str(msg.content or "")) for msg in self.truncation_reducer.messages)
+
+
+class SessionManager:
+    """
+    Keeps one ChatSession per session id with LRU/TTL eviction and a memory cap.
+
+    Sessions with a turn running or waiting for the session lock are never evicted.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = config.SESSION_MAX_COUNT,
+        ttl_seconds: float = config.SESSION_TTL_SECONDS,
+        max_total_chars: int = config.SESSION_MAX_TOTAL_CHARS,
+        history_target_count: int = config.CHAT_HISTORY_TARGET_COUNT,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_total_chars = max_total_chars
+        self.history_target_count = history_target_count
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, session_id: str | None = None) -> ChatSession:
+        """Return the session for the given id, creating it if needed."""
+        session_id = session_id or config.DEFAULT_SESSION_ID
+        self._evict_expired()
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = ChatSession(session_id, self.history_target_count)
+            self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        session.touch()
+
+        self._enforce_limits(keep=session_id)
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        """Drop a session. Returns True if it existed."""
+        return self._sessions.pop(session_id, None) is not None
+
+    def clear(self):
+        """Drop every session (e.g. when starting fresh conversations)."""
+        self._sessions.clear()
+
+    def stats(self) -> dict:
+        return {
+            "active_sessions": len(self._sessions),
+            "total_chars": sum(s.approximate_size() for s in self._sessions.values()),
+            "evictions": self.evictions,
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _evictable(self, keep: str | None = None):
+        """Yield evictable session ids in least-recently-used order."""
+        for session_id, session in list(self._sessions.items()):
+            if session_id != keep and not session.active_turns and not session.lock.locked():
+                yield session_id
+
+    def _evict_expired(self):
+        if not self.ttl_seconds:
+            return
+        now = time.monotonic()
+        for session_id in self._evictable():
+            if now - self._sessions[session_id].last_used > self.ttl_seconds:
+                del self._sessions[session_id]
+                self.evictions += 1
+
+    def _enforce_limits(self, keep: str):
+        total_chars = sum(s.approximate_size() for s in self._sessions.values())
+        for session_id in self._evictable(keep=keep):
+            over_count = len(self._sessions) > self.max_sessions
+            over_memory = self.max_total_chars and total_chars > self.max_total_chars
+            if not (over_count or over_memory):
+                break
+            total_chars -= self._sessions[session_id].approximate_size()
+            del self._sessions[session_id]
+            self.evictions += 1
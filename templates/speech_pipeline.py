@@ -0,0 +1,266 @@
+import asyncio
+import base64
+import re
+
+import config
+from audio_utils import encode_audio, wav_header
+from inference_executor import inference_executor
+from lazy_loader import lazy_import
+from tts_cache import audio_cache, cache_key
+
+# Heavy speech engines are only imported when the active mode first uses them
+offline_tts = lazy_import("offline_text_to_speech")
+azure_tts = lazy_import("azure_text_to_speech")
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace, or a line break
+_SENTENCE_END = re.compile(r"([.!?…]+[\"')\]]*)\s+|\n+")
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "prof", "sr", "jr", "vs", "etc", "e.g", "i.e", "no"}
+
+
+class SentenceSegmenter:
+    """
+    Incrementally splits streamed text into complete sentences.
+
+    A boundary is only confirmed once the whitespace after the punctuation
+    has arrived, so "3.5" or "Dr. Smith" split across chunks stay intact.
+    Very short fragments are merged into the next sentence.
+    """
+
+    def __init__(self, min_chars: int = config.TTS_MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> list:
+        """Add streamed text and return any sentences completed by it."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            if match.group(1) == ".":
+                words = self._buffer[start:match.start()].split()
+                last_word = words[-1].lower() if words else ""
+                if last_word in _ABBREVIATIONS or (len(last_word) == 1 and last_word.isalpha()):
+                    continue
+            sentence = self._buffer[start:match.end()].strip()
+            if len(sentence) < self.min_chars:
+                continue
+            sentences.append(sentence)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> list:
+        """Return whatever text is left once the stream has finished."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return [remainder] if remainder else []
+
+
+def _engine_and_voice(gender: str) -> tuple:
+    """Identify the engine and voice used for the active mode (part of the audio cache key)."""
+    if config.USE_OLLAMA:
+        return f"coqui:{config.COQUI_TTS_MODEL}", config.COQUI_TTS_VOICES.get(gender, "p240")
+    return "azure", config.AZURE_TTS_VOICES.get(gender, "en-US-GuyNeural")
+
+
+def _synthesize_pcm_blocking(text: str, gender: str, key: str) -> tuple:
+    """Synthesize one piece of text to (16-bit PCM bytes, sample rate), using the audio cache."""
+    cached = audio_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if config.USE_OLLAMA:
+        pcm, sample_rate = offline_tts.synthesize_pcm(text, gender=gender)
+    else:
+        pcm, sample_rate = azure_tts.text_to_speech_to_pcm(text, gender=gender)
+
+    audio_cache.put(key, pcm, sample_rate)
+    return pcm, sample_rate
+
+
+async def synthesize_pcm(text: str, gender: str = "male") -> tuple:
+    """Synthesize text to (16-bit PCM bytes, sample rate) on the inference executor.
+    In-memory cache hits are returned without waiting for an executor slot."""
+    engine, voice = _engine_and_voice(gender)
+    key = cache_key(engine, voice, text)
+    cached = audio_cache.get_memory(key)
+    if cached is not None:
+        return cached
+
+    label = "coqui_tts" if config.USE_OLLAMA else "azure_tts"
+    return await inference_executor.run(_synthesize_pcm_blocking, text, gender, key, label=label)
+
+
+async def synthesize_speech(text: str, gender: str = "male", audio_format: str = "wav") -> bytes:
+    """
+    Synthesize text to encoded audio bytes ("wav", "pcm" or "opus", see audio_utils.encode_audio).
+
+    The text is synthesized (and cached) sentence by sentence, so a reply that
+    shares sentences with earlier ones only synthesizes the new parts.
+    """
+    results = await asyncio.gather(*(synthesize_pcm(sentence, gender) for sentence in split_sentences(text)))
+    results = [(pcm, sample_rate) for pcm, sample_rate in results if pcm]
+    if not results:
+        return b""
+
+    pcm = b"".join(pcm for pcm, _ in results)
+    if audio_format == "opus":
+        # Opus encoding is CPU bound, keep it off the event loop
+        return await inference_executor.run(encode_audio, pcm, results[0][1], audio_format, label="opus_encode")
+    return encode_audio(pcm, results[0][1], audio_format)
+
+
+def split_sentences(text: str) -> list:
+    """Split a complete piece of text into sentences for incremental synthesis."""
+    segmenter = SentenceSegmenter()
+    return segmenter.feed(text) + segmenter.flush()
+
+
+async def stream_speech_pcm(text: str, gender: str = "male"):
+    """
+    Synthesize text sentence by sentence, yielding (PCM bytes, sample rate) in order.
+
+    Every sentence is queued for synthesis up front, so later sentences are
+    being synthesized while earlier ones are already being sent.
+    """
+    tasks = [asyncio.ensure_future(synthesize_pcm(sentence, gender)) for sentence in split_sentences(text)]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def stream_speech_wav(text: str, gender: str = "male", include_header: bool = True):
+    """
+    Stream text as one WAV (streaming-length header, then PCM per sentence),
+    or as raw PCM frames when include_header is False.
+
+    Returns (sample rate, async iterator of bytes). The first sentence is
+    synthesized before returning so the sample rate is known up front.
+    """
+    sentences = stream_speech_pcm(text, gender)
+    try:
+        first_pcm, sample_rate = await sentences.__anext__()
+    except StopAsyncIteration:
+        return None, None
+
+    async def chunks():
+        if include_header:
+            yield wav_header(sample_rate)
+        yield first_pcm
+        async for pcm, _ in sentences:
+            if pcm:
+                yield pcm
+
+    return sample_rate, chunks()
+
+
+async def stream_with_speech(events, gender: str = "male"):
+    """
+    Add sentence-level audio to a stream of chat events (see chatbot.stream_message).
+
+    Text events are passed straight through. As each sentence completes it
+    is synthesized while the LLM keeps generating, and emitted in order as
+    {"type": "audio", "index": n, "text": sentence, "audio": <base64 WAV>}.
+    The final done/error event is emitted after all audio for the answer.
+    """
+    output = asyncio.Queue()
+    # Ordered ("audio", sentence, synthesis task) / ("event", event) items
+    pending = asyncio.Queue()
+
+    def schedule(sentences):
+        for sentence in sentences:
+            pending.put_nowait(("audio", sentence, asyncio.ensure_future(synthesize_speech(sentence, gender))))
+
+    async def read_text():
+        segmenter = SentenceSegmenter()
+        try:
+            async for event in events:
+                if event["type"] == "delta":
+                    output.put_nowait(event)
+                    schedule(segmenter.feed(event["content"]))
+                else:
+                    if event["type"] == "done":
+                        schedule(segmenter.flush())
+                    pending.put_nowait(("event", event))
+        except Exception as e:
+            # Let the client know the answer was cut short instead of just ending the stream
+            print(f"Error reading chat stream: {e}")
+            pending.put_nowait(("event", {"type": "error", "message": str(e)}))
+        finally:
+            pending.put_nowait(None)
+
+    async def emit_audio():
+        index = 0
+        try:
+            while (item := await pending.get()) is not None:
+                if item[0] == "event":
+                    output.put_nowait(item[1])
+                    continue
+                _, sentence, task = item
+                try:
+                    audio_bytes = await task
+                except Exception as e:
+                    print(f"Error synthesizing sentence: {e}")
+                    audio_bytes = b""
+                if audio_bytes:
+                    output.put_nowait({
+                        "type": "audio",
+                        "index": index,
+                        "text": sentence,
+                        "audio": base64.b64encode(audio_bytes).decode("ascii"),
+                    })
+                    index += 1
+        finally:
+            output.put_nowait(None)
+
+    reader = asyncio.create_task(read_text())
+    emitter = asyncio.create_task(emit_audio())
+    try:
+        while (event := await output.get()) is not None:
+            yield event
+    finally:
+        reader.cancel()
+        emitter.cancel()
+        # Drop syntheses for sentences that will no longer be sent
+        while not pending.empty():
+            item = pending.get_nowait()
+            if item is not None and item[0] == "audio":
+                item[2].cancel()
+        await asyncio.gather(reader, emitter, return_exceptions=True)
+
+
+class SpeechPlayer:
+    """
+    Plays sentences on the local speaker in order while generation continues (CLI mode).
+    """
+
+    def __init__(self, gender: str = "male"):
+        self.gender = gender
+        self._last = None
+
+    def say(self, sentence: str):
+        previous = self._last
+
+        async def play():
+            if previous is not None:
+                await previous
+            try:
+                await asyncio.to_thread(self._play_blocking, sentence)
+            except Exception as e:
+                print(f"Error playing speech: {e}")
+
+        self._last = asyncio.ensure_future(play())
+
+    async def finish(self):
+        """Wait until every queued sentence has been spoken."""
+        if self._last is not None:
+            await self._last
+
+    def _play_blocking(self, sentence: str):
+        if config.USE_OLLAMA:
+            offline_tts.speak_text(sentence, gender=self.gender)
+        else:
+            azure_tts.text_to_speech(sentence, gender=self.gender)
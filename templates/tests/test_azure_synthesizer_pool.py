@@ -0,0 +1,151 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from azure_synthesizer_pool import SynthesizerPool
+
+
+class FakeSignal:
+    def __init__(self):
+        self.callbacks = []
+
+    def connect(self, callback):
+        self.callbacks.append(callback)
+
+    def fire(self):
+        for callback in self.callbacks:
+            callback(None)
+
+
+class FakeConnection:
+    """Stands in for speechsdk.Connection."""
+
+    def __init__(self):
+        self.connected = FakeSignal()
+        self.disconnected = FakeSignal()
+        self.closed = False
+
+    def open(self, for_continuous_recognition: bool):
+        self.connected.fire()
+
+    def close(self):
+        self.closed = True
+        self.disconnected.fire()
+
+
+class FakeSynthesizer:
+    """Stands in for speechsdk.SpeechSynthesizer."""
+
+    def __init__(self, voice: str):
+        self.voice = voice
+
+    def speak_text_async(self, text: str):
+        result = SimpleNamespace(reason="SynthesizingAudioCompleted", audio_data=f"{self.voice}:{text}".encode())
+        return SimpleNamespace(get=lambda: result)
+
+
+class FakeFactory:
+    """Same shape as create_azure_synthesizer, recording what it created."""
+
+    def __init__(self):
+        self.connections = []
+
+    def __call__(self, voice: str):
+        connection = FakeConnection()
+        connection.open(True)
+        self.connections.append(connection)
+        return FakeSynthesizer(voice), connection
+
+
+def make_pool(**kwargs):
+    factory = FakeFactory()
+    kwargs.setdefault("max_idle_per_voice", 2)
+    kwargs.setdefault("idle_timeout", None)
+    return SynthesizerPool(factory=factory, **kwargs), factory
+
+
+def test_acquire_reuses_released_synthesizer():
+    pool, factory = make_pool()
+
+    first = pool.acquire("en-GB-RyanNeural")
+    pool.release(first)
+    second = pool.acquire("en-GB-RyanNeural")
+
+    assert second is first
+    assert len(factory.connections) == 1
+    assert pool.stats()["created"] == 1
+    assert pool.stats()["reused"] == 1
+
+
+def test_voices_are_pooled_separately():
+    pool, factory = make_pool()
+
+    ryan = pool.acquire("en-GB-RyanNeural")
+    pool.release(ryan)
+    sonia = pool.acquire("en-GB-SoniaNeural")
+
+    assert sonia is not ryan
+    assert sonia.synthesizer.voice == "en-GB-SoniaNeural"
+    assert len(factory.connections) == 2
+
+
+def test_disconnected_synthesizer_is_not_reused():
+    pool, factory = make_pool()
+
+    pooled = pool.acquire("en-GB-RyanNeural")
+    pool.release(pooled)
+    factory.connections[0].disconnected.fire()
+
+    replacement = pool.acquire("en-GB-RyanNeural")
+
+    assert replacement is not pooled
+    assert factory.connections[0].closed
+    assert pool.stats()["discarded"] == 1
+
+
+def test_failed_synthesis_discards_synthesizer():
+    pool, factory = make_pool()
+
+    with pytest.raises(RuntimeError):
+        with pool.synthesizer("en-GB-RyanNeural"):
+            raise RuntimeError("synthesis failed")
+
+    assert factory.connections[0].closed
+    assert pool.stats()["idle"]["en-GB-RyanNeural"] == 0
+
+
+def test_release_beyond_pool_size_closes_synthesizer():
+    pool, factory = make_pool(max_idle_per_voice=1)
+
+    first = pool.acquire("en-GB-RyanNeural")
+    second = pool.acquire("en-GB-RyanNeural")
+    pool.release(first)
+    pool.release(second)
+
+    assert not factory.connections[0].closed
+    assert factory.connections[1].closed
+    assert pool.stats()["idle"]["en-GB-RyanNeural"] == 1
+
+
+def test_idle_synthesizers_are_evicted_without_further_requests():
+    pool, factory = make_pool(idle_timeout=0.05)
+
+    pool.prewarm(["en-GB-RyanNeural", "en-GB-SoniaNeural"])
+    deadline = time.monotonic() + 2
+    while not all(connection.closed for connection in factory.connections) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert all(connection.closed for connection in factory.connections)
+    assert pool.stats()["evicted"] == 2
+    assert pool.stats()["idle"] == {"en-GB-RyanNeural": 0, "en-GB-SoniaNeural": 0}
+
+
+def test_close_closes_idle_synthesizers():
+    pool, factory = make_pool(idle_timeout=60)
+
+    pool.prewarm(["en-GB-RyanNeural"])
+    pool.close()
+
+    assert factory.connections[0].closed
+    assert pool.stats()["idle"] == {}
@@ -0,0 +1,64 @@
+from memory_relevance import estimate_tokens, format_past_memory, select_memories
+
+
+def test_select_memories_ranks_and_drops_duplicates():
+    scored = [("tea", 0.6), ("roses", 0.9), ("tea", 0.7), ("", 0.95)]
+
+    selected = select_memories(scored, threshold=None, relative_cutoff=None, top_k=5)
+
+    assert selected == [("roses", 0.9), ("tea", 0.7)]
+
+
+def test_select_memories_applies_threshold_and_top_k():
+    scored = [("a", 0.9), ("b", 0.8), ("c", 0.7), ("d", 0.4)]
+
+    assert select_memories(scored, threshold=0.5, relative_cutoff=None, top_k=5) == [("a", 0.9), ("b", 0.8), ("c", 0.7)]
+    assert select_memories(scored, threshold=None, relative_cutoff=None, top_k=2) == [("a", 0.9), ("b", 0.8)]
+
+
+def test_select_memories_relative_cutoff():
+    scored = [("a", 1.0), ("b", 0.85), ("c", 0.5)]
+
+    assert select_memories(scored, threshold=None, relative_cutoff=0.8, top_k=5) == [("a", 1.0), ("b", 0.85)]
+
+
+def test_select_memories_keeps_single_list_rrf_hits_without_relative_cutoff():
+    # RRF with k=60: found by both searches vs. only one of them
+    scored = [("both", 2 / 61), ("text only", 1 / 62), ("vector only", 1 / 62)]
+
+    selected = select_memories(scored, threshold=None, relative_cutoff=None, top_k=5)
+
+    assert [memory for memory, _ in selected] == ["both", "text only", "vector only"]
+
+
+def test_select_memories_empty():
+    assert select_memories([]) == []
+
+
+def test_format_past_memory_includes_memories_in_order():
+    block, count, tokens = format_past_memory(["I grew roses.", "My sister is Anne."], token_budget=None)
+
+    assert count == 2
+    assert block.index("I grew roses.") < block.index("My sister is Anne.")
+    assert block.startswith("\n\n[Past Memories that MAY be useful]:\n")
+    assert tokens == estimate_tokens(
+        "\n\n[Past Memories that MAY be useful]:\n"
+    ) + estimate_tokens("I grew roses.") + 1 + estimate_tokens("My sister is Anne.") + 1
+
+
+def test_format_past_memory_respects_token_budget():
+    count_words = lambda text: len(text.split())
+    memories = ["one two three", "four five six seven eight nine ten", "eleven"]
+
+    block, count, tokens = format_past_memory(memories, token_budget=12, count_tokens=count_words)
+
+    # Header is 6 words; the second memory doesn't fit, the shorter third one still does
+    assert count == 2
+    assert "one two three" in block and "eleven" in block
+    assert "four" not in block
+    assert tokens <= 12
+
+
+def test_format_past_memory_nothing_fits():
+    assert format_past_memory(["a very long memory"], token_budget=1) == ("", 0, 0)
+    assert format_past_memory([], token_budget=100) == ("", 0, 0)
@@ -0,0 +1,67 @@
+import numpy as np
+
+import config
+from multivector_pooling import pool_multivector
+
+
+def make_multivector(tokens: int = 32, dim: int = 16, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(tokens, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_pool_factor_reduces_vector_count():
+    vectors = make_multivector(32)
+
+    pooled = pool_multivector(vectors, pool_factor=2, max_vectors=0)
+
+    assert pooled.shape == (16, vectors.shape[1])
+    assert pooled.dtype == np.float32
+
+
+def test_pooled_vectors_are_normalized_and_cls_is_kept():
+    vectors = make_multivector(32)
+
+    pooled = pool_multivector(vectors, pool_factor=4, max_vectors=0)
+
+    np.testing.assert_array_equal(pooled[0], vectors[0])
+    np.testing.assert_allclose(np.linalg.norm(pooled, axis=1), 1.0, rtol=1e-5)
+
+
+def test_max_vectors_caps_output():
+    vectors = make_multivector(32)
+
+    for max_vectors in (1, 2, 5):
+        pooled = pool_multivector(vectors, pool_factor=1, max_vectors=max_vectors)
+        assert len(pooled) == max_vectors
+
+    # Pool factor and cap together: the smaller target wins
+    assert len(pool_multivector(vectors, pool_factor=2, max_vectors=8)) == 8
+    assert len(pool_multivector(vectors, pool_factor=8, max_vectors=8)) == 4
+
+
+def test_no_pooling_returns_input():
+    vectors = make_multivector(10)
+
+    np.testing.assert_array_equal(pool_multivector(vectors, pool_factor=1, max_vectors=0), vectors)
+    np.testing.assert_array_equal(pool_multivector(vectors, pool_factor=2, max_vectors=0)[:1], vectors[:1])
+    assert len(pool_multivector(vectors[:1], pool_factor=4, max_vectors=0)) == 1
+
+
+def test_defaults_are_read_from_config_at_call_time(monkeypatch):
+    vectors = make_multivector(32)
+
+    monkeypatch.setattr(config, "COLBERT_POOL_FACTOR", 4)
+    monkeypatch.setattr(config, "COLBERT_MAX_VECTORS", None)
+    assert len(pool_multivector(vectors)) == 8
+
+    monkeypatch.setattr(config, "COLBERT_MAX_VECTORS", 3)
+    assert len(pool_multivector(vectors)) == 3
+
+
+def test_opposite_vectors_cancelling_out_stay_finite():
+    vectors = np.array([[1, 0], [0, 1], [0, -1], [0, 1], [0, -1]], dtype=np.float32)
+
+    with np.errstate(all="raise"):
+        pooled = pool_multivector(vectors, pool_factor=1, max_vectors=2)
+
+    assert np.isfinite(pooled).all()
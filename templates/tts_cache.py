@@ -0,0 +1,175 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import appdirs
+
+import config
+from audio_utils import wav_header, wav_to_pcm
+
+
+def normalize_tts_text(text: str) -> str:
+    """Normalize whitespace only; case and punctuation change how text is spoken."""
+    return " ".join(text.split())
+
+
+def cache_key(engine: str, voice: str, text: str) -> str:
+    """Content address for a synthesized utterance."""
+    return hashlib.sha256(f"{engine}|{voice}|{normalize_tts_text(text)}".encode("utf-8")).hexdigest()
+
+
+def default_cache_dir() -> str:
+    """TTS cache directory under the app data dir (same location rules as Qdrant storage)."""
+    app_data_dir = os.environ.get('COMPANIO_APP_DIR') or appdirs.user_data_dir("Companio", "Group25")
+    return os.path.join(app_data_dir, "tts_cache")
+
+
+class AudioCache:
+    """
+    Two-tier cache of synthesized audio, keyed by (engine, voice, normalized text).
+
+    Entries are (16-bit PCM bytes, sample rate). The in-memory tier is an LRU
+    bounded by bytes; the on-disk tier stores WAV files with a total size cap,
+    evicting the least recently used files first. Thread safe, since
+    synthesis runs on the inference executor.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        max_memory_bytes: int = config.TTS_CACHE_MEMORY_BYTES,
+        max_disk_bytes: int = config.TTS_CACHE_DISK_BYTES,
+    ):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None  # Computed on first disk access
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def get_memory(self, key: str):
+        """Look up the in-memory tier only (cheap enough for the event loop)."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+            return entry
+
+    def get(self, key: str):
+        """Look up both tiers. Disk hits are promoted to memory."""
+        entry = self.get_memory(key)
+        if entry is not None:
+            return entry
+
+        if self.max_disk_bytes:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    entry = wav_to_pcm(f.read())
+                os.utime(path)  # Mark as recently used for disk eviction
+            except (OSError, EOFError, ValueError):
+                entry = None
+            if entry is not None:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                self._put_memory(key, entry)
+                return entry
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, pcm: bytes, sample_rate: int):
+        if not pcm:
+            return
+        entry = (pcm, sample_rate)
+        self._put_memory(key, entry)
+        if self.max_disk_bytes:
+            try:
+                self._put_disk(key, entry)
+            except OSError as e:
+                print(f"Could not write TTS cache entry: {e}")
+
+    def _put_memory(self, key: str, entry: tuple):
+        size = len(entry[0])
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old[0])
+            self._memory[key] = entry
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted[0])
+
+    def _put_disk(self, key: str, entry: tuple):
+        pcm, sample_rate = entry
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        data = wav_header(sample_rate, data_size=len(pcm)) + pcm
+
+        # Write atomically so concurrent readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            # Replace under the lock so a file written twice (concurrent requests
+            # for the same sentence) is only counted once
+            try:
+                replaced_bytes = os.path.getsize(path)
+            except OSError:
+                replaced_bytes = 0
+            os.replace(tmp_path, path)
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(data) - replaced_bytes
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.name.endswith(".wav"))
+
+    def _evict_disk(self):
+        """Delete least recently used files until the disk tier is under 90% of its cap."""
+        files = sorted(
+            (entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".wav")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        total = sum(entry.stat().st_size for entry in files)
+        target = self.max_disk_bytes * 0.9
+        for entry in files:
+            if total <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = sum(self._stats.values())
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {
+                **self._stats,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+audio_cache = AudioCache()
@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+from semantic_kernel import Kernel
+
+import config
+from inference_executor import inference_executor
+from lazy_loader import LazyModel
+from context_packer import get_token_counter
+
+WARMUP_TEXT = "Hello, how are you today?"
+
+
+class ReadinessTracker:
+    """Tracks per-component readiness and warm-up durations for the /ready endpoint."""
+
+    def __init__(self):
+        self.components = {}
+
+    def reset(self, names):
+        self.components = {name: {"status": "pending", "warmup_ms": None, "error": None} for name in names}
+
+    def mark(self, name: str, status: str, warmup_ms: float | None = None, error: str | None = None):
+        self.components[name] = {"status": status, "warmup_ms": warmup_ms, "error": error}
+
+    @property
+    def ready(self) -> bool:
+        # Failed components are reported, and components warming after a reload are
+        # already usable, so only first-time "pending" components hold back readiness
+        return bool(self.components) and all(c["status"] != "pending" for c in self.components.values())
+
+    def report(self) -> dict:
+        return {"ready": self.ready, "components": dict(self.components)}
+
+
+readiness = ReadinessTracker()
+
+
+def _warmup_steps(kernel: Kernel) -> dict:
+    """
+    Build the warm-up steps for every model loaded in the kernel.
+
+    Maps each name to (key, coroutine factory). The key identifies what the
+    step warms (the component object, tokenizer or speech engine), so a
+    reload can skip components that were already warmed up.
+    """
+    steps = {}
+
+    def is_deferred(name):
+        # Deferred components stay unloaded until a real request needs them
+        component = kernel.services.get(name)
+        return isinstance(component, LazyModel) and not component.is_loaded
+
+    if "dense_embedding_model" in kernel.services:
+        dense_embedding_model = kernel.services["dense_embedding_model"]
+        steps["dense_embedding_model"] = (
+            id(dense_embedding_model),
+            lambda: dense_embedding_model.generate_embeddings([WARMUP_TEXT]),
+        )
+
+    if "bm25_embedding_model" in kernel.services and not is_deferred("bm25_embedding_model"):
+        bm25_model = kernel.services["bm25_embedding_model"]
+        steps["bm25_embedding_model"] = (id(bm25_model), lambda: inference_executor.run(
+            lambda: (list(bm25_model.embed([WARMUP_TEXT])), next(bm25_model.query_embed(WARMUP_TEXT))),
+            label="warmup",
+        ))
+
+    if "late_interaction_embedding_model" in kernel.services and not is_deferred("late_interaction_embedding_model"):
+        late_model = kernel.services["late_interaction_embedding_model"]
+        steps["late_interaction_embedding_model"] = (id(late_model), lambda: inference_executor.run(
+            lambda: (list(late_model.embed([WARMUP_TEXT])), next(late_model.query_embed(WARMUP_TEXT))),
+            label="warmup",
+        ))
+
+    if "qdrant_client" in kernel.services:
+        qdrant_client = kernel.services["qdrant_client"]
+        steps["qdrant_client"] = (id(qdrant_client), lambda: qdrant_client.get_collections())
+
+    # Tokenizer the context packer uses to measure prompts for the active chat model
+    token_counter = get_token_counter()
+    if token_counter.tokenizer_name and not token_counter.is_loaded:
+        steps["chat_tokenizer"] = (
+            token_counter.tokenizer_name,
+            lambda: inference_executor.run(token_counter.load, label="warmup"),
+        )
+
+    if config.USE_OLLAMA and config.USE_SPEECH_OUTPUT:
+        def warm_tts():
+            from speech_pipeline import offline_tts
+            return offline_tts.speak_text_to_bytes(WARMUP_TEXT)
+        steps["text_to_speech"] = ("offline", lambda: inference_executor.run(warm_tts, label="warmup"))
+
+    if not config.USE_OLLAMA and config.USE_SPEECH_OUTPUT and config.AZURE_SPEECH_KEY:
+        def warm_azure_tts():
+            from azure_synthesizer_pool import synthesizer_pool
+            synthesizer_pool.prewarm(set(config.AZURE_TTS_VOICES.values()))
+        steps["text_to_speech"] = ("azure", lambda: inference_executor.run(warm_azure_tts, label="warmup"))
+
+    return steps
+
+
+# What each warm-up step last warmed successfully (name -> key from _warmup_steps)
+_warmed = {}
+
+
+async def warm_up_models(kernel: Kernel, only_new: bool = False):
+    """
+    Run one dummy pass through every loaded model in parallel so the first
+    real request doesn't pay for lazy initialisation (tokenizers, first torch
+    forward pass, ONNX sessions, TTS first inference).
+
+    With only_new (after a config change), components already warmed up are
+    skipped and readiness is not reset: the new ones are reported as
+    "warming", which doesn't make /ready fail while the kernel is swapped.
+    """
+    steps = _warmup_steps(kernel)
+    if only_new and readiness.ready:
+        steps = {name: step for name, step in steps.items() if _warmed.get(name) != step[0]}
+        for name in steps:
+            readiness.mark(name, "warming")
+    else:
+        readiness.reset(["chatbot", *steps])
+        readiness.mark("chatbot", "ready")
+
+    async def run_step(name, key, step):
+        start_time = time.perf_counter()
+        try:
+            await step()
+            warmup_ms = round((time.perf_counter() - start_time) * 1000, 1)
+            _warmed[name] = key
+            readiness.mark(name, "ready", warmup_ms=warmup_ms)
+            print(f"Warmed up {name} in {warmup_ms} ms")
+        except Exception as e:
+            warmup_ms = round((time.perf_counter() - start_time) * 1000, 1)
+            readiness.mark(name, "failed", warmup_ms=warmup_ms, error=str(e))
+            print(f"Warm-up failed for {name}: {e}")
+
+    await asyncio.gather(*(run_step(name, key, step) for name, (key, step) in steps.items()))